@@ -3,6 +3,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+import shutil
 import tclogger
 import time
 
@@ -10,8 +11,9 @@ from datetime import timedelta
 from zoneinfo import ZoneInfo
 
 from tclogger import TCLogger, logger, TCLogstr, logstr, colored, decolored, add_fills
+from tclogger import get_terminal_columns
 from tclogger import Runtimer, OSEnver, shell_cmd
-from tclogger import get_now_ts, get_now_str, get_now_ts_str
+from tclogger import get_now, get_now_ts, get_now_str, get_now_ts_str
 from tclogger import TIMEZONE, set_timezone, tcdatetime
 from tclogger import ts_to_str, str_to_ts, dt_to_str, unify_ts_and_str
 from tclogger import CaseInsensitiveDict, dict_to_str, dict_to_lines
@@ -20,6 +22,7 @@ from tclogger import dict_get, dict_set, dict_get_all, dict_set_all
 from tclogger import dict_flatten
 from tclogger import FileLogger
 from tclogger import TCLogbar, TCLogbarGroup
+from tclogger import SharedCounters, SharedCountersPoller
 from tclogger import brk, brc, brp
 from tclogger import int_bits, max_key_len, chars_len
 from tclogger import to_digits, get_by_threshold
@@ -55,7 +58,108 @@ def test_logger_level():
     print("Now the level is set to warning:")
     logger.note("You should not see this note message")
     logger.warn("You should see this warning message")
+    logger.info("You should not see this stdlib info message")
+    logger.warning("You should see this stdlib warning message")
     logger.exit_quiet(True)
+    logger.info("You should see this stdlib info message")
+
+
+def test_logger_lazy_msg():
+    logger.note("> Lazy msg is only rendered when it would be emitted:")
+    logger.dbug(lambda: "You should not see this dbug message")
+    logger.mesg(lambda: f"This is a lazy message at {get_now_str()}")
+    logger.mesg("This is a %s message with %d args", msg_args=("template", 2))
+
+    total = 1000000
+    t1 = time.perf_counter()
+    for i in range(total):
+        logger.dbug(f"[{i}] disabled dbug")
+    t2 = time.perf_counter()
+    logger.note(f"Disabled dbug: {(t2-t1)/total*1e9:.0f} ns/call")
+
+
+def test_logger_batch():
+    with logger.batch():
+        logger.note("> These lines are written in one batch:")
+        with logger.temp_indent(2):
+            for i in range(5):
+                logger.mesg(f"[{i}] batched message")
+        logger.dbug("You should not see this dbug message")
+    logger.log_many([("note", "> log_many:"), ("okay", "okay line", {"indent": 2})])
+
+
+def test_logger_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def work(idx: int):
+        # indent and level are local to each thread
+        if idx % 2:
+            logger.set_level("debug")
+        with logger.temp_indent(idx * 2):
+            time.sleep(0.01)
+            logger.dbug(f"[{idx}] dbug only in odd threads")
+            logger.mesg(f"[{idx}] indent {idx*2}")
+        return logger.log_indent
+
+    logger.note("> Threads:")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        indents = list(executor.map(work, range(4)))
+    logger.okay(f"indents after temp_indent: {indents}, main: {logger.log_indent}")
+
+
+def test_logger_aio():
+    import asyncio
+
+    async def handle(idx: int):
+        with logger.temp_indent(2):
+            for i in range(3):
+                logger.aio.mesg(f"[{idx}] request step {i}")
+                await asyncio.sleep(0)
+
+    async def main():
+        logger.aio.note("> Log from coroutines without blocking loop:")
+        await asyncio.gather(*[handle(idx) for idx in range(3)])
+        await logger.aflush()
+        stats = logger.aio.get_stats()
+        avg_us = stats["avg_block_time"] * 1e6
+        logger.okay(f"calls: {stats['calls']}, avg block: {avg_us:.1f}us")
+
+    asyncio.run(main())
+
+
+def test_logger_filter():
+    filter_logger = TCLogger(filter_rate_limit=3, filter_summary_interval=0.5)
+    filter_logger.note("> At most 3 records per second per call site:")
+    t1 = time.perf_counter()
+    for i in range(1000000):
+        filter_logger.mesg(lambda: f"[{i}] hot loop message")
+    t2 = time.perf_counter()
+    filter_logger.flush()
+    filter_logger.okay(f"1M filtered calls: {t2-t1:.2f}s")
+
+    filter_logger.note("> Summary is written after interval, without later calls:")
+    for i in range(100):
+        filter_logger.mesg(f"[{i}] burst message")
+    time.sleep(1)
+
+    filter_logger.set_filter(every_n=4)
+    filter_logger.note("> Every 4th record:")
+    for i in range(10):
+        filter_logger.mesg(f"[{i}] every 4th message")
+    filter_logger.set_filter()
+
+
+def test_logger_dedup():
+    dedup_logger = TCLogger(use_dedup=True, dedup_timeout=0.5)
+    dedup_logger.note("> Repeated messages are collapsed:")
+    with dedup_logger.temp_indent(2):
+        for i in range(1000):
+            dedup_logger.warn("× Retry failed")
+        dedup_logger.okay("✓ Retry succeeded")
+        for i in range(3):
+            dedup_logger.warn("× Retry failed again")
+        time.sleep(1)
+    dedup_logger.note("> Summary above is written after timeout")
 
 
 def test_fillers():
@@ -184,6 +288,22 @@ def test_color():
     print(s4)
 
 
+def test_color_speed():
+    from tclogger.logs import LOG_METHOD_COLORS
+
+    total = 100000
+    t1 = time.perf_counter()
+    for i in range(total):
+        for method in LOG_METHOD_COLORS:
+            logstr.colored_str("This is a colored message", method)
+    t2 = time.perf_counter()
+    per_call = (t2 - t1) / total / len(LOG_METHOD_COLORS) * 1e9
+    logger.note(f"colored_str: {per_call:.0f} ns/call")
+
+    # without color spec cache: ~ 3600 ns/call
+    #    with color spec cache: ~  550 ns/call
+
+
 def test_case_insensitive_dict():
     d = CaseInsensitiveDict()
     d["Hello"] = "old world"
@@ -298,12 +418,231 @@ def test_log_file():
     logger.note("This is multi lines, \nwith line break", indent=2)
 
 
+def test_log_file_speed():
+    total = 1000000
+    for buffer_size in [0, 65536]:
+        file_logger = TCLogger(
+            use_file=True,
+            file_path=Path(__file__).parent / f"logger_{buffer_size}.log",
+            file_mode="w",
+            file_buffer_size=buffer_size,
+            verbose=False,
+        )
+        t1 = time.perf_counter()
+        for i in range(total):
+            file_logger.mesg(f"[{i}] This is a file message")
+        file_logger.flush()
+        t2 = time.perf_counter()
+        logger.note(f"buffer_size={buffer_size}: {total/(t2-t1):.0f} lines/s")
+
+    # open-per-line: ~ 40k lines/s
+    # buffer_size=0: ~ 80k lines/s
+    # buffer_size=65536: ~ 100k lines/s
+
+
+def test_log_render_speed():
+    import io
+
+    render_logger = TCLogger(
+        use_prefix=True,
+        use_prefix_color=True,
+        use_file=True,
+        file_path=Path(__file__).parent / "logger_render.log",
+        file_mode="w",
+        file_buffer_size=65536,
+    )
+    # console and file: colored and plain texts are rendered from same record
+    render_logger.console_sink.stream = io.StringIO()
+    total = 100000
+    t1 = time.perf_counter()
+    for i in range(total):
+        render_logger.note(f"[{i}] This is a console and file message")
+    render_logger.flush()
+    t2 = time.perf_counter()
+    logger.note(f"console + file: {(t2-t1)/total*1e6:.1f} us/call")
+
+    # plain text of file lines: rendered from record segments, or decolored()
+    # from colored text, as before records have segments
+    records = [
+        render_logger.render_records("note", f"[{i}] This is a file message")[-1]
+        for i in range(total)
+    ]
+    colored_texts = render_logger.render_format(records, "colored")
+    t1 = time.perf_counter()
+    plain_texts = render_logger.render_format(records, "plain")
+    t2 = time.perf_counter()
+    decolored_texts = [decolored(text) for text in colored_texts]
+    t3 = time.perf_counter()
+    assert plain_texts == decolored_texts
+    logger.note(
+        f"plain from segments: {(t2-t1)/total*1e9:.0f} ns/record, "
+        f"decolored(): {(t3-t2)/total*1e9:.0f} ns/record"
+    )
+    render_logger.close()
+
+    # plain from segments: ~ 1800 ns/record, decolored(): ~ 3500 ns/record
+
+
+def _log_file_worker(args: tuple):
+    worker_idx, total, log_path = args
+    worker_logger = TCLogger(
+        name=f"worker{worker_idx}",
+        use_file=True,
+        file_path=log_path,
+        file_process_safe=True,
+        file_buffer_size=65536,
+        verbose=False,
+    )
+    for i in range(total):
+        worker_logger.note(f"[w{worker_idx}] [{i}] ", end="")
+        worker_logger.mesg("x" * (worker_idx * 997 % 9000 + 100), end="")
+        worker_logger.okay(" end")
+    worker_logger.close()
+
+
+def test_log_file_multiprocess():
+    import multiprocessing
+    import re
+
+    workers, total = 8, 2000
+    log_path = Path(__file__).parent / "logger_mp.log"
+    open(log_path, "w").close()
+    with multiprocessing.Pool(workers) as pool:
+        pool.map(_log_file_worker, [(i, total, log_path) for i in range(workers)])
+
+    # every line should be intact, and lines of each worker should be in order
+    last_idxs = {}
+    bad_count = 0
+    lines = log_path.read_text().splitlines()
+    for line in lines:
+        match = re.fullmatch(r"\[w(\d+)\] \[(\d+)\] (x+) end", line)
+        if not match:
+            bad_count += 1
+            continue
+        worker_idx, idx = int(match.group(1)), int(match.group(2))
+        if len(match.group(3)) != worker_idx * 997 % 9000 + 100:
+            bad_count += 1
+        if idx != last_idxs.get(worker_idx, -1) + 1:
+            bad_count += 1
+        last_idxs[worker_idx] = idx
+    logger.note(f"Lines: {len(lines)}/{workers*total}, bad: {bad_count}")
+
+
+def test_log_jsonl():
+    jsonl_logger = TCLogger(
+        name="JsonlApp",
+        use_jsonl=True,
+        jsonl_path=Path(__file__).parent / "logger.jsonl",
+        file_mode="w",
+    )
+    jsonl_logger.note("This is a note message, also in jsonl")
+    jsonl_logger.mesg(f"Colored {logstr.okay('msg')} is plain in jsonl", indent=2)
+    jsonl_logger.okay("This is a message with extra fields", extra={"task_id": 1})
+    jsonl_logger.close()
+
+
+def test_logger_ring():
+    log_path = Path(__file__).parent / "ring.log"
+    ring_logger = TCLogger(
+        name="RingApp", use_file=True, file_path=log_path, file_mode="w", ring_size=5
+    )
+    ring_logger.note("> dbug records are captured, but not rendered")
+    for i in range(100):
+        ring_logger.dbug("[%d] dbug context", msg_args=(i,))
+    ring_logger.err("× Something failed, last 5 dbug records are dumped to file")
+    for i in range(3):
+        ring_logger.dbug("[%d] dbug context after err", msg_args=(i,))
+    ring_logger.erro("× erro also dumps dbug records captured after last dump")
+    ring_logger.close()
+    logger.file(log_path.read_text())
+
+
+def test_logger_sinks():
+    from tclogger import ConsoleSink, FileSink
+
+    sinks_logger = TCLogger(name="SinksApp")
+    log_path = Path(__file__).parent / "warns.log"
+    # warn and above to file, and plain text to stdout
+    sinks_logger.add_sink(FileSink(log_path, file_mode="w", level="warning"))
+    sinks_logger.add_sink(ConsoleSink(stream=sys.stdout, format="plain"))
+    sinks_logger.note("note: in colored stderr and plain stdout")
+    sinks_logger.warn("warn: also in file")
+    sinks_logger.close()
+    logger.file(log_path.read_text())
+
+
+def test_logger_async():
+    async_logger = TCLogger(
+        use_async=True, async_queue_size=100, async_overflow="drop_oldest"
+    )
+    async_logger.note("This is an async note message")
+    async_logger.okay("This is a  half message", end=", ")
+    async_logger.okay("this is another half")
+    for i in range(1000):
+        async_logger.mesg(f"[{i}] async message")
+    async_logger.flush()
+    logger.note(f"Dropped records: {async_logger.dropped_count}")
+    async_logger.close()
+
+
+def test_logger_collected():
+    import gc
+    import tempfile
+    import threading
+
+    log_dir = Path(tempfile.mkdtemp())
+    thread_count = threading.active_count()
+    for i in range(50):
+        short_logger = TCLogger(
+            use_file=True,
+            file_path=log_dir / f"short_{i}.log",
+            file_buffer_size=1024,
+            use_async=True,
+        )
+        short_logger.file(f"short-lived logger {i}")
+        del short_logger
+    gc.collect()
+    written_count = sum(
+        (log_dir / f"short_{i}.log").read_text().count("short-lived") for i in range(50)
+    )
+    logger.note(
+        f"Left threads: {threading.active_count() - thread_count}, "
+        f"written: {written_count}/50"
+    )
+    shutil.rmtree(log_dir)
+
+
 def test_file_logger():
+    import os
+
     file_logger = FileLogger(Path(__file__).parent / "test.log")
     file_logger.log("This is an error message", "error")
     file_logger.log("This is a default message")
     file_logger.log("This is a prefixed message", prefix="+")
     file_logger.log("This is a success message", msg_type="success")
+    if os.path.isdir("/proc/self/fd"):
+        fd_count = len(os.listdir("/proc/self/fd"))
+        for i in range(200):
+            FileLogger(Path(__file__).parent / "test.log").log(f"short-lived {i}")
+        fd_count = len(os.listdir("/proc/self/fd")) - fd_count
+        logger.note(f"Left fds of 200 short-lived FileLoggers: {fd_count}")
+
+
+def test_log_file_rotate():
+    file_logger = TCLogger(
+        use_file=True,
+        file_path=Path(__file__).parent / "rotates" / "logger.log",
+        file_max_bytes=1024 * 1024,
+        file_backup_count=3,
+        file_compress="gzip",
+        verbose=False,
+    )
+    for i in range(200000):
+        file_logger.mesg(f"[{i}] This is a rotated file message")
+    file_logger.close()
+    tclogger.sinks.file_compressor.join()
+    backup_names = [p.name for p in file_logger.file_sink.get_backup_paths()]
+    logger.note(f"Backups (oldest to newest): {backup_names}")
 
 
 def test_align_dict_list():
@@ -383,6 +722,193 @@ def test_logbar_group():
         epoch_bar.update(1, desc=f"[{epoch+1}/{epochs}]", flush=True)
 
 
+def test_logbar_group_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = 16
+    total = 20000
+    bars = [TCLogbar(total=total, head=f"[{i:>2}]") for i in range(workers)]
+    TCLogbarGroup(bars, show_at_init=False)
+
+    def work(bar: TCLogbar):
+        for i in range(total):
+            bar.update(1)
+
+    t1 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(work, bars))
+    t2 = time.perf_counter()
+    print()
+    logger.okay(f"{workers} bars in {workers} threads: {t2-t1:.2f}s")
+
+
+def test_logbar_thread():
+    total = 10000000
+    for use_thread in [False, True]:
+        logbar = TCLogbar(
+            total=total, head=f"use_thread={use_thread}", use_thread=use_thread
+        )
+        t1 = time.perf_counter()
+        for i in range(total):
+            logbar.update(1)
+        t2 = time.perf_counter()
+        logbar.close()
+        print()
+        logger.okay(f"{(t2-t1)/total*1e9:.0f} ns/update")
+
+    # use_thread=False: ~ 4000 ns/update
+    # use_thread=True: ~ 350 ns/update
+
+
+def test_logbar_update_speed():
+    import timeit
+
+    total = 1000000
+    # no redraw, to measure per-update cost of clock and throttling
+    logbar = TCLogbar(total=total * 10, flush_interval=1000, verbose=False)
+    get_now_ns = timeit.timeit(get_now, number=total) / total * 1e9
+    counter_ns = timeit.timeit(time.perf_counter, number=total) / total * 1e9
+    update_ns = timeit.timeit(lambda: logbar.update(1), number=total) / total * 1e9
+    logger.note(f"get_now(): {get_now_ns:.0f} ns, perf_counter(): {counter_ns:.0f} ns")
+    logger.okay(f"update(): {update_ns:.0f} ns")
+
+    # get_now(): ~ 750 ns, perf_counter(): ~ 100 ns
+    # update() with get_now() and datetime deltas: ~ 3000 ns
+    # update() with perf_counter(): ~ 1000 ns
+
+
+def test_logbar_construct_speed():
+    import timeit
+
+    total = 100000
+    logbar = TCLogbar(total=total * 10, head="head", desc="desc", verbose=False)
+    logbar.refresh(force=True)
+
+    def _construct():
+        logbar.count += 1
+        logbar.construct_bar_str()
+
+    construct_ns = timeit.timeit(_construct, number=total) / total * 1e9
+    logger.okay(f"construct_bar_str(): {construct_ns:.0f} ns")
+
+    # rebuild all segments: ~ 13000 ns
+    # cached static segments, grid and time strings: ~ 8000 ns
+
+
+def test_logbar_auto_cols():
+    import timeit
+
+    logger.note("> Resize terminal, and bar would fit new width")
+    logbar = TCLogbar(total=300, head="auto_cols", auto_cols=True)
+    for i in range(300):
+        logbar.update(1)
+        time.sleep(0.02)
+    print()
+
+    total = 100000
+    get_size = shutil.get_terminal_size
+    get_size_ns = timeit.timeit(get_size, number=total) / total * 1e9
+    get_cols_ns = timeit.timeit(get_terminal_columns, number=total) / total * 1e9
+    logger.okay(f"shutil.get_terminal_size(): {get_size_ns:.0f} ns")
+    logger.okay(f"get_terminal_columns(): {get_cols_ns:.0f} ns")
+
+    # shutil.get_terminal_size(): ~ 5000 ns (env lookups and ioctl syscall)
+    # get_terminal_columns(): ~ 120-280 ns (cached, refreshed on SIGWINCH)
+
+
+def test_logbar_plain():
+    import io
+    from contextlib import redirect_stdout
+
+    total = 10000000
+    for use_tty in [True, False]:
+        # stdout is not a tty here, as in CI or systemd
+        output = io.StringIO()
+        with redirect_stdout(output):
+            logbar = TCLogbar(total=total, head="plain", use_tty=use_tty)
+            for i in range(total):
+                logbar.update(1)
+            logbar.close()
+        output_str = output.getvalue()
+        logger.note(f"> use_tty={use_tty}:")
+        logger.okay(
+            f"  {len(output_str)} chars, {output_str.count(chr(10))} lines, "
+            f"{output_str.count(chr(27))} escapes"
+        )
+        if not use_tty:
+            print(output_str, end="")
+
+    logbar = TCLogbar(total=200, head="logged", use_tty=False, plain_logger=logger)
+    for i in range(200):
+        logbar.update(1)
+        time.sleep(0.01)
+    logbar.close()
+
+    # use_tty=True: ~ 20k chars of frames and escapes in 15s, growing with time
+    # use_tty=False: ~ 1k chars in 11 lines, one per 10% (or per 10s), no escapes
+
+
+def test_logbar_wrap():
+    logger.note("> len-aware iterable:")
+    logbar = TCLogbar(head="list")
+    for item in logbar.wrap(list(range(300))):
+        time.sleep(0.005)
+    print()
+
+    logger.note("> generator, with total:")
+    logbar = TCLogbar(head="gen")
+    for item in logbar.wrap((i for i in range(300)), total=300):
+        time.sleep(0.005)
+    print()
+
+    total = 5000000
+    logger.note(f"> {total} fast items:")
+    logbar = TCLogbar(total=total, head="update")
+    start_t = time.perf_counter()
+    for item in range(total):
+        logbar.update(1)
+    update_t = time.perf_counter() - start_t
+    print()
+
+    logbar = TCLogbar(head="wrap")
+    start_t = time.perf_counter()
+    for item in logbar.wrap(range(total)):
+        pass
+    wrap_t = time.perf_counter() - start_t
+    print()
+    logger.okay(f"update(1): {update_t:.2f}s, wrap(): {wrap_t:.2f}s")
+
+    # update(1): ~ 6.6-7.7s
+    # wrap(): ~ 0.5-1.3s
+
+
+def count_shard_items(counters: SharedCounters, slot: int, n: int) -> int:
+    for i in range(n):
+        # ~ 200 ns, no IPC
+        counters.add(slot)
+        if i % 1000 == 0:
+            time.sleep(0.001)
+    return n
+
+
+def test_logbar_shared_counters():
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = 4
+    shard_size = 500000
+    counters = SharedCounters(workers)
+    bars = [TCLogbar(total=shard_size, head=f"shard{i}") for i in range(workers)]
+    total_bar = TCLogbar(total=shard_size * workers, head="total ")
+    TCLogbarGroup([total_bar, *bars])
+    with SharedCountersPoller(counters, bars=bars, total_bar=total_bar):
+        with ProcessPoolExecutor(workers) as executor:
+            args = ([counters] * workers, range(workers), [shard_size] * workers)
+            results = list(executor.map(count_shard_items, *args))
+    print()
+    logger.okay(f"counts: {counters.get_counts()}, results: {sum(results)}")
+    counters.close()
+
+
 def test_logbar_total():
     total = 500
 
@@ -475,6 +1001,44 @@ def test_logbar_window_speed():
     #   immediately: ~  21k it/s
 
 
+def test_logbar_window_ewma():
+    import timeit
+
+    # bursty workload: 50 fast updates, then a pause
+    logbar = TCLogbar(
+        total=2000,
+        window_duration=3600,
+        window_point_interval=1.0,
+        window_flush_interval=0.25,
+        window_ewma_tau=2.0,
+    )
+    for i in range(40):
+        for j in range(50):
+            logbar.update(1)
+        time.sleep(0.05)
+    logbar.flush()
+    print()
+
+    # flush cost stays flat, as window points grow to 3600
+    for duration in [60, 600, 3600]:
+        window = TCLogbar(total=10**9, window_duration=duration, verbose=False).window
+        ticks = iter(range(1, 10**9))
+
+        def _flush():
+            # one point per second, so each flush adds a point and evicts oldest
+            t = next(ticks)
+            window.update_now_and_count(window.init_t + t, t * 1000)
+            window.flush_window()
+
+        timeit.timeit(_flush, number=duration + 10)
+        flush_ns = timeit.timeit(_flush, number=10000) / 10000 * 1e9
+        points = len(window.window_points)
+        logger.okay(f"{points} points: {flush_ns:.0f} ns/flush")
+
+    # list with pop(0) and rounded deltas in each check: ~ 4000-4900 ns/flush
+    # deque ring buffer: ~ 1300-1400 ns/flush
+
+
 def test_decorations():
     text = "Hello World"
     logger.note(f"Brackets: {logstr.mesg(brk(text))}")
@@ -784,12 +1348,15 @@ def test_tree_folder():
 if __name__ == "__main__":
     # test_logger_verbose()
     # test_logger_level()
+    # test_logger_lazy_msg()
+    # test_logger_batch()
     # test_fillers()
     # test_run_timer_and_logger()
     # test_logger_prefix()
     # test_now_and_timezone()
     # test_dt_to_str()
     # test_color()
+    # test_color_speed()
     # test_case_insensitive_dict()
     # test_dict_get_and_set()
     # test_dict_to_str()
@@ -797,18 +1364,40 @@ if __name__ == "__main__":
     # test_align_dict_list()
     # test_list_of_dicts()
     # test_log_file()
+    # test_log_file_speed()
+    # test_log_render_speed()
+    # test_log_file_multiprocess()
+    # test_log_jsonl()
+    # test_logger_ring()
+    # test_logger_sinks()
+    # test_logger_async()
+    # test_logger_collected()
     # test_file_logger()
+    # test_log_file_rotate()
     # test_logbar()
     # test_logbar_group()
+    # test_logbar_group_threads()
+    # test_logbar_thread()
+    # test_logbar_update_speed()
+    # test_logbar_auto_cols()
+    # test_logbar_construct_speed()
+    # test_logbar_plain()
+    # test_logbar_wrap()
+    # test_logbar_shared_counters()
     # test_logbar_total()
     # test_logbar_verbose()
     # test_logbar_window()
     # test_logbar_window_speed()
+    # test_logbar_window_ewma()
     # test_decorations()
     # test_math()
     # test_get_by_threshold()
     # test_str_slice()
     # test_temp_indent()
+    # test_logger_threads()
+    # test_logger_aio()
+    # test_logger_filter()
+    # test_logger_dedup()
     # test_attrs_to_dict()
     # test_obj_param()
     # test_match_val()
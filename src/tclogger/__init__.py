@@ -14,7 +14,12 @@ from .exceptions import BreakpointException, raise_breakpoint
 from .colors import FONT_TYPE, COLOR_TYPE, BG_COLOR_TYPE
 from .colors import colored, decolored
 from .logs import TCLogger, logger, TCLogstr, logstr, TCLogclr, logclr, log_error
+from .queues import TCLogQueue
+from .asyncs import AsyncTCLogger
+from .filters import TCLogFilter
+from .sinks import LogSink, ConsoleSink, FileSink, JsonlSink, RingSink, SocketSink
 from .fills import add_fills
+from .terminals import TerminalSize, get_terminal_columns, get_terminal_lines
 from .times import get_now, get_now_ts, get_now_str, get_now_ts_str, get_date_str
 from .times import TIMEZONE, set_timezone, tcdatetime
 from .times import ts_to_str, str_to_ts, str_to_t
@@ -33,6 +38,7 @@ from .tables import is_listable, norm_any_to_str_list, norm_any_to_type_list
 from .tables import dict_to_table_str, rows_to_table_str
 from .files import FileLogger
 from .bars import TCLogbar, TCLogbarGroup
+from .counters import SharedCounters, SharedCountersPoller
 from .decorations import brk, brc, brp
 from .strings import chars_slice
 from .attrs import attrs_to_dict
@@ -0,0 +1,213 @@
+"""Non-blocking logging facade for coroutines on asyncio event loop"""
+
+import asyncio
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from .forks import register_exit_hook
+from .logs import LOG_METHOD_BITS, RING_DUMP_METHODS
+
+if TYPE_CHECKING:
+    from .logs import TCLogger, TCLogRecord
+
+
+class AsyncTCLogger:
+    """Same methods as TCLogger (note, mesg, okay, warn, ...), but callers on event loop
+    only render the record and put it to an asyncio.Queue, then return immediately.
+    A writer task of the running loop writes records to sinks in an executor thread.
+
+    - max_size: max pending records; records beyond it are dropped and counted,
+        so logging never blocks the loop waiting for slow sinks
+    - batch_size: max records written in one executor call
+
+    Calls made outside a running loop are written synchronously by the logger.
+    Use `await aflush()` before loop ends, to not leave records in queue.
+    Time spent in these methods on loop thread is accumulated in `block_time`.
+    """
+
+    def __init__(
+        self, logger: "TCLogger", max_size: int = 10000, batch_size: int = 256
+    ):
+        self.logger = logger
+        self.max_size = max(int(max_size), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.loop: asyncio.AbstractEventLoop = None
+        self.queue: asyncio.Queue = None
+        self.writer_task: asyncio.Task = None
+        self.executor: ThreadPoolExecutor = None
+        self.call_count = 0
+        self.dropped_count = 0
+        self.block_time = 0.0
+        self.max_block_time = 0.0
+        register_exit_hook(self, self.write_left_records)
+
+    def get_queue(self) -> asyncio.Queue:
+        """Queue and writer task of running loop, or None if no running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if loop is not self.loop or self.writer_task.done():
+            # first call, or previous loop is closed (e.g. another asyncio.run())
+            self.write_left_records()
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.max_size)
+            if self.executor is None:
+                # one thread keeps records in order
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"{self.logger.name}.aio"
+                )
+            self.writer_task = loop.create_task(self.run_writer())
+        return self.queue
+
+    def write_left_records(self):
+        """Write records left in queue of previous loop (or at exit), not awaited."""
+        if self.queue is None:
+            return
+        records = []
+        while not self.queue.empty():
+            records.append(self.queue.get_nowait())
+        if records:
+            self.logger.put_records(records)
+
+    async def run_writer(self):
+        queue = self.queue
+        while True:
+            records = [await queue.get()]
+            while len(records) < self.batch_size and not queue.empty():
+                records.append(queue.get_nowait())
+            try:
+                await self.loop.run_in_executor(
+                    self.executor, self.logger.put_records, records
+                )
+            finally:
+                for _ in records:
+                    queue.task_done()
+
+    def add_records(self, records: list["TCLogRecord"]):
+        batch = self.logger.batch_var.get()
+        if batch is not None and batch.is_open:
+            batch.records.extend(records)
+            return
+        queue = self.get_queue()
+        if queue is None:
+            self.logger.put_records(records)
+            return
+        for record in records:
+            try:
+                queue.put_nowait(record)
+            except asyncio.QueueFull:
+                self.dropped_count += 1
+
+    def route_log(self, method, msg, *args, **kwargs):
+        logger = self.logger
+        if logger.should_suppress(method):
+            if logger.ring_sink is not None:
+                logger.capture_record(method, msg, kwargs)
+            return
+        if logger.log_filter is not None and not logger.is_filter_passed(
+            method, sys._getframe(2)
+        ):
+            return
+        start_t = time.perf_counter()
+        if logger.ring_sink is not None and method in RING_DUMP_METHODS:
+            logger.dump_ring()
+        records = logger.render_records(method, msg, *args, **kwargs)
+        if records:
+            self.add_records(records)
+        block_t = time.perf_counter() - start_t
+        self.call_count += 1
+        self.block_time += block_t
+        if block_t > self.max_block_time:
+            self.max_block_time = block_t
+
+    def get_stats(self) -> dict:
+        return {
+            "calls": self.call_count,
+            "dropped": self.dropped_count,
+            "pending": self.queue.qsize() if self.queue is not None else 0,
+            "block_time": self.block_time,
+            "avg_block_time": self.block_time / max(self.call_count, 1),
+            "max_block_time": self.max_block_time,
+        }
+
+    async def aflush(self):
+        """Wait until records logged before this call are written and flushed."""
+        loop = asyncio.get_running_loop()
+        if self.queue is not None and loop is self.loop:
+            await self.queue.join()
+        await loop.run_in_executor(self.executor, self.logger.flush)
+
+    async def aclose(self):
+        """Flush pending records and stop writer task."""
+        await self.aflush()
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+            self.writer_task = None
+            self.loop = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def err(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["err"]:
+            self.route_log("err", msg, *args, **kwargs)
+
+    def erro(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["erro"]:
+            self.route_log("erro", msg, *args, **kwargs)
+
+    def warn(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["warn"]:
+            self.route_log("warn", msg, *args, **kwargs)
+
+    def glow(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["glow"]:
+            self.route_log("glow", msg, *args, **kwargs)
+
+    def hint(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["hint"]:
+            self.route_log("hint", msg, *args, **kwargs)
+
+    def note(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["note"]:
+            self.route_log("note", msg, *args, **kwargs)
+
+    def mesg(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["mesg"]:
+            self.route_log("mesg", msg, *args, **kwargs)
+
+    def file(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["file"]:
+            self.route_log("file", msg, *args, **kwargs)
+
+    def line(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["line"]:
+            self.route_log("line", msg, *args, **kwargs)
+
+    def success(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["success"]:
+            self.route_log("success", msg, *args, **kwargs)
+
+    def okay(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["okay"]:
+            self.route_log("okay", msg, *args, **kwargs)
+
+    def fail(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["fail"]:
+            self.route_log("fail", msg, *args, **kwargs)
+
+    def back(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["back"]:
+            self.route_log("back", msg, *args, **kwargs)
+
+    def dbug(self, msg: str = "", *args, **kwargs):
+        if self.logger.log_bits & LOG_METHOD_BITS["dbug"]:
+            self.route_log("dbug", msg, *args, **kwargs)
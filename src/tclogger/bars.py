@@ -1,121 +1,140 @@
 import math
-import os
 import sys
 import threading
+import time
 
-from datetime import datetime
-from typing import Union, Literal
+from collections import deque
+from typing import Iterable, Iterator, Union, Literal
 
-from .times import get_now, t_to_str, dt_to_str, dt_to_sec
+from .times import get_now, t_to_str, dt_to_str
 from .maths import int_bits
-from .logs import logstr
+from .logs import TCLogger, logstr
 from .colors import decolored
 from .cursors import CursorController
+from .forks import register_exit_hook, unregister_exit_hook
+from .terminals import get_terminal_columns, is_stream_tty
+
+NUM_TYPES = (int, float)
+MIN_AUTO_COLS = 10
 
 
 class ElapseWindow:
+    """Iterations per second and remain seconds of recent `window_duration` seconds.
+
+    Points of (t, count) are kept in a fixed-capacity ring buffer, one point per
+    `window_point_interval` seconds, so adding and evicting points are O(1),
+    and window rate is updated from oldest and newest points on each flush.
+
+    - ewma_tau: if set, rate is also smoothed by EWMA with this time constant
+        (seconds), which gives stable it/s and ETA on bursty workloads
+
+    Times are seconds of monotonic clock (time.perf_counter()).
+    """
+
     def __init__(
         self,
-        init_t: datetime = None,
+        init_t: float = None,
         count: int = 0,
         window_duration: float = 60.0,
         window_point_interval: float = 1.0,
         window_flush_interval: float = 0.5,
+        ewma_tau: float = None,
     ):
-        self.init_t = init_t or get_now()
+        self.init_t = init_t if init_t is not None else time.perf_counter()
+        self.now = self.init_t
         self.count = count
         self.window_duration = window_duration
         self.window_point_interval = window_point_interval
         self.window_flush_interval = window_flush_interval
-        # list of (datetime, count)
-        self.window_points: list[tuple[datetime, int]] = [(init_t, count)]
-
-    def _window_start_t(self) -> datetime:
-        return self.window_points[0][0]
-
-    def _window_end_t(self) -> datetime:
-        return self.window_points[-1][0]
-
-    def _window_start_count(self) -> int:
-        return self.window_points[0][1]
-
-    def _window_end_count(self) -> int:
-        return self.window_points[-1][1]
+        self.ewma_tau = ewma_tau
+        # oldest points are evicted by deque when full, even if flush is late
+        self.capacity = math.ceil(window_duration / window_point_interval) + 2
+        self.reset_window(self.init_t, count)
 
-    def update_now_and_count(self, now: datetime, count: int):
+    def update_now_and_count(self, now: float, count: int):
         self.now = now
         self.count = count
 
-    def _calc_window_dt_seconds(self) -> float:
-        window_dt = self._window_end_t() - self._window_start_t()
-        return dt_to_sec(window_dt, precision=3)
-
-    def _calc_start_to_now_dt_seconds(self) -> float:
-        now_dt = self.now - self._window_start_t()
-        return dt_to_sec(now_dt, precision=3)
-
-    def _calc_end_to_now_dt_seconds(self) -> float:
-        now_dt = self.now - self._window_end_t()
-        return dt_to_sec(now_dt, precision=3)
-
-    def _should_add_new_point(self) -> bool:
-        if len(self.window_points) <= 1:
-            return True
-        window_max_seconds = self.window_point_interval * (len(self.window_points) - 1)
-        if self._calc_start_to_now_dt_seconds() >= window_max_seconds:
-            return True
-        return False
-
-    def _should_del_old_point(self) -> bool:
-        if len(self.window_points) <= 2:
-            return False
-        if self._calc_window_dt_seconds() > self.window_duration:
-            return True
-        return False
-
     def _should_flush_window(self) -> bool:
-        if self._calc_end_to_now_dt_seconds() >= self.window_flush_interval:
-            return True
-        return False
+        return self.now - self.window_points[-1][0] >= self.window_flush_interval
 
     def flush_window(self):
+        now, count = self.now, self.count
+        points = self.window_points
         # add new point or update last point
-        if self._should_add_new_point():
-            self.window_points.append((self.now, self.count))
+        if now - self.point_t >= self.window_point_interval:
+            points.append((now, count))
+            self.point_t = now
         else:
-            self.window_points[-1] = (self.now, self.count)
+            points[-1] = (now, count)
         # remove old outdated points
-        while True:
-            if self._should_del_old_point():
-                self.window_points.pop(0)
-            else:
-                break
-
-    def _calc_window_elapsed_count(self) -> int:
-        return self._window_end_count() - self._window_start_count()
+        start_t = now - self.window_duration
+        while len(points) > 2 and points[0][0] < start_t:
+            points.popleft()
+        # window rate from oldest point to now
+        dt = now - points[0][0]
+        if dt > 0:
+            self.window_rate = (count - points[0][1]) / dt
+        # ewma rate from last flush to now
+        if self.ewma_tau:
+            dt = now - self.ewma_t
+            if dt > 0:
+                rate = (count - self.ewma_count) / dt
+                if self.ewma_rate is None:
+                    self.ewma_rate = rate
+                else:
+                    alpha = 1 - math.exp(-dt / self.ewma_tau)
+                    self.ewma_rate += alpha * (rate - self.ewma_rate)
+                self.ewma_t = now
+                self.ewma_count = count
+
+    def _calc_rate(self) -> float:
+        if self.ewma_rate is not None:
+            return self.ewma_rate
+        return self.window_rate
 
     def calc_remain_seconds_by_window(self, remain_count: int) -> float:
-        elapsed_count = self._calc_window_elapsed_count()
-        if elapsed_count <= 0:
+        rate = self._calc_rate()
+        if rate <= 0:
             return None
-        return self._calc_window_dt_seconds() * remain_count / elapsed_count
+        return remain_count / rate
 
     def calc_iter_per_second_by_window(self) -> float:
-        dt_seconds = self._calc_window_dt_seconds()
-        if dt_seconds <= 0:
-            return 0.0
-        return round(
-            self._calc_window_elapsed_count() / dt_seconds,
-            ndigits=1,
-        )
+        return round(self._calc_rate(), ndigits=1)
 
-    def reset_window(self, start_t: datetime, count: int):
+    def reset_window(self, start_t: float, count: int):
         self.init_t = start_t
         self.count = count
-        self.window_points = [(start_t, count)]
+        # deque of (t, count)
+        self.window_points: deque[tuple[float, int]] = deque(
+            [(start_t, count)], maxlen=self.capacity
+        )
+        self.point_t = start_t
+        self.window_rate = 0.0
+        self.ewma_rate: float = None
+        self.ewma_t = start_t
+        self.ewma_count = count
 
 
 class TCLogbar:
+    """Progress bar.
+
+    - use_thread: a background thread redraws bar every `flush_interval` seconds,
+        and update() only adds count (and sets head/desc), so it is cheap to call
+        in hot loops. Counting is not locked, so only update a bar from one thread.
+        Call close() (or use `with`) to stop thread and draw final frame.
+    - auto_cols: resize grid to fill terminal line; terminal width is read from
+        process-wide cache refreshed on SIGWINCH, so redraws make no syscalls
+    - window_duration: if set, it/s and remain time are calculated by recent window,
+        and `window_ewma_tau` smooths them for bursty workloads (see ElapseWindow)
+    - wrap(iterable): yield items and update bar in chunks, whose size adapts
+        to iteration rate, so update() runs a few times per `flush_interval`
+    - use_tty: if False (default when stdout is not a tty, e.g., pipe in CI or
+        systemd), bar is written as plain append-only lines without colors and
+        cursor moves, once every `plain_interval` seconds or `plain_percent` percents,
+        and at close() or linebreak. Lines are logged by `plain_logger` if set.
+    """
+
     PROGRESS_LOGSTR = {
         0: logstr.file,
         25: logstr.note,
@@ -141,10 +160,16 @@ class TCLogbar:
         window_duration: float = None,
         window_point_interval: float = 1.0,
         window_flush_interval: float = 0.5,
+        window_ewma_tau: float = None,
         grid_symbols: str = " ▏▎▍▌▋▊▉█",
         grid_shades: str = "░▒▓█",
         grid_mode: Literal["symbol", "shade"] = "symbol",
         verbose: bool = True,
+        use_thread: bool = False,
+        use_tty: bool = None,
+        plain_interval: float = 10.0,
+        plain_percent: float = 10.0,
+        plain_logger: TCLogger = None,
     ):
         self.total = total
         self.start_count = start_count
@@ -162,10 +187,37 @@ class TCLogbar:
         self.grid_shades = grid_shades
         self.grid_mode = grid_mode
         self.verbose = verbose
+        if use_tty is None:
+            use_tty = is_stream_tty(sys.stdout)
+        self.use_tty = use_tty
+        self.plain_interval = plain_interval
+        self.plain_percent = plain_percent
+        self.plain_logger = plain_logger
+        if not use_tty:
+            self.show_color = False
         self.bar_str = None
-        self.init_t = get_now()
+        self.bar_width = 0
+        self.fit_columns: int = None
+        # cached segments of bar_str, and last drawn frame
+        self.static_key: tuple = None
+        self.static_segs: tuple = None
+        self.colored_segs: dict[str, tuple] = {}
+        self.grid_key: tuple = None
+        self.grid_str: str = None
+        self.elapsed_key: int = None
+        self.elapsed_str: str = None
+        self.remain_key: int = None
+        self.remain_str: str = None
+        self.last_bar_str: str = None
+        # monotonic clock, so bar is immune to wall clock jumps;
+        # wall clock is only read for show_datetime
+        self.init_t = time.perf_counter()
         self.start_t = self.init_t
         self.flush_t = self.init_t
+        # time, count and next percent step of last plain line
+        self.plain_t = self.init_t
+        self.plain_count: int = None
+        self.plain_next_percent = 0
         self.window_duration = window_duration
         if window_duration:
             self.window = ElapseWindow(
@@ -173,72 +225,168 @@ class TCLogbar:
                 window_duration=window_duration,
                 window_point_interval=window_point_interval,
                 window_flush_interval=window_flush_interval,
+                ewma_tau=window_ewma_tau,
             )
         else:
             self.window = None
-        self.cursor = CursorController(flush=True)
+        # cursor strings are composed with content, and written at once
+        self.cursor = CursorController(write=False)
         self.line_height: int = 1
         self.group: TCLogbarGroup = None
         self.node_idx: int = None
+        self.lock = threading.RLock()
+        self.render_thread: threading.Thread = None
+        if use_thread:
+            self.start_render_thread()
         if self.show_at_init:
             self.update(flush=True)
 
+    def start_render_thread(self):
+        self.refresh_interval = self.flush_interval or 0.1
+        self.stop_event = threading.Event()
+        self.render_thread = threading.Thread(
+            target=self.run_render, name="TCLogbar.render", daemon=True
+        )
+        self.render_thread.start()
+        register_exit_hook(self, self.close)
+
+    def run_render(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            with self.lock:
+                self.refresh(force=True)
+
+    def close(self):
+        """Stop render thread, and draw final frame."""
+        if self.render_thread is None and self.use_tty:
+            return
+        if self.render_thread is not None:
+            self.stop_event.set()
+            if self.render_thread is not threading.current_thread():
+                self.render_thread.join()
+            self.render_thread = None
+            unregister_exit_hook(self, self.close)
+        self.flush_final()
+
+    def flush_final(self):
+        """Draw frame (or plain line, if not written) of current count."""
+        with self.lock:
+            self.refresh(force=True)
+            if not self.use_tty:
+                self.log_plain(is_final=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def is_num(self, num: Union[int, float]):
-        return isinstance(num, (int, float))
+        return isinstance(num, NUM_TYPES)
 
     def is_grouped(self):
         return self.group is not None and self.node_idx is not None
 
-    def move_cursor(self):
+    def move_cursor(self) -> str:
+        move_str = ""
         # Move up to the first line of this bar's content
         if self.line_height > 1:
-            self.cursor.move(row=self.line_height - 1)
+            move_str += self.cursor.move(row=self.line_height - 1)
         # Move to beginning of line first, then erase entire line
-        self.cursor.move_to_beg()
-        self.cursor.erase_line("beg_to_end")
-
-    def write(self, msg: str):
-        sys.stdout.write(msg)
-        # Clear from cursor to end of line to remove any trailing remnants
-        sys.stdout.write("\033[0K")
+        move_str += self.cursor.move_to_beg()
+        move_str += self.cursor.erase_line("beg_to_end")
+        return move_str
+
+    def write(self, msg: str, move_str: str = ""):
+        # Clear from cursor to end of line to remove any trailing remnants,
+        # and write all in one call
+        sys.stdout.write(f"{move_str}{msg}\033[0K")
         sys.stdout.flush()
 
+    def calc_line_height(self, msg: str) -> int:
+        terminal_width = get_terminal_columns(fallback=120)
+        if msg is self.bar_str:
+            msg_len = self.bar_width
+        else:
+            msg_len = len(decolored(msg))
+        if msg_len > terminal_width:
+            return math.ceil(msg_len / terminal_width)
+        else:
+            return 1
+
     def log(self, msg: str = None):
         if msg is None:
             return
         if self.is_grouped():
             if not self.group.verbose:
                 return
-            self.group.move_cursor(self.node_idx)
-            self.group.write(msg)
+            self.line_height = self.calc_line_height(msg)
+            self.group.post(self.node_idx, msg, self.line_height)
         else:
             if not self.verbose:
                 return
-            self.move_cursor()
-            self.write(msg)
-
-        try:
-            terminal_width = os.get_terminal_size().columns
-        except OSError:
-            terminal_width = 120
+            self.write(msg, move_str=self.move_cursor())
+            self.line_height = self.calc_line_height(msg)
+
+    def is_plain_due(self) -> bool:
+        if (
+            self.plain_percent
+            and self.percent is not None
+            and self.percent >= self.plain_next_percent
+        ):
+            return True
+        return self.now - self.plain_t >= self.plain_interval
 
-        if len(decolored(msg)) > terminal_width:
-            self.line_height = math.ceil(len(decolored(msg)) / terminal_width)
+    def log_plain(self, is_final: bool = False):
+        """Write bar as a plain line, if it is due, or if final count is not written."""
+        if is_final:
+            if self.count == self.plain_count:
+                return
+        elif not self.is_plain_due():
+            return
+        self.construct_bar_str()
+        self.plain_t = self.now
+        self.plain_count = self.count
+        if self.percent is not None and self.plain_percent:
+            step = self.plain_percent
+            self.plain_next_percent = (self.percent // step + 1) * step
+        if self.plain_logger is not None:
+            self.plain_logger.mesg(self.bar_str)
         else:
-            self.line_height = 1
+            sys.stdout.write(f"{self.bar_str}\n")
+            sys.stdout.flush()
 
     def flush(self):
         if self.verbose or (self.is_grouped() and self.group.verbose):
+            if not self.use_tty:
+                self.log_plain()
+                return
             self.construct_bar_str()
+            # skip terminal write if frame is same as last drawn one
+            if self.bar_str == self.last_bar_str:
+                return
+            self.last_bar_str = self.bar_str
             self.log(self.bar_str)
 
+    def invalidate(self):
+        """Force next flush to redraw, e.g., after cursor moves to a new line."""
+        self.last_bar_str = None
+
     def linebreak(self):
+        if not self.use_tty:
+            # plain lines are already ended, so only write final count
+            if self.verbose or (self.is_grouped() and self.group.verbose):
+                self.refresh(force=True)
+                self.log_plain(is_final=True)
+            return
         if self.is_grouped():
             if self.group.verbose:
                 self.group.write("\n")
+            for bar in self.group.bars:
+                bar.invalidate()
         else:
             if self.verbose:
                 self.write("\n")
+            self.invalidate()
 
     def _elapsed_count(self):
         return self.count - self.start_count
@@ -248,11 +396,16 @@ class TCLogbar:
 
     def _calc_dt_seconds(self) -> float:
         self.dt = self.now - self.start_t
-        self.dt_seconds = dt_to_sec(self.dt, precision=3)
+        self.dt_seconds = round(self.dt, 3)
         return self.dt_seconds
 
     def _should_use_window(self):
-        return self.window and self.dt_seconds >= self.window.window_duration
+        if not self.window:
+            return False
+        # ewma rate is usable once smoothed, before window is filled
+        if self.window.ewma_rate is not None:
+            return True
+        return self.dt_seconds >= self.window.window_duration
 
     def _is_remain_seconds_calcable(self):
         return (
@@ -291,9 +444,7 @@ class TCLogbar:
             return self._calc_iter_per_second_by_global()
 
     def _should_flush(self) -> bool:
-        flush_dt = self.now - self.flush_t
-        flush_seconds = dt_to_sec(flush_dt, precision=3)
-        return flush_seconds >= self.flush_interval
+        return self.now - self.flush_t >= self.flush_interval
 
     def update(
         self,
@@ -305,8 +456,6 @@ class TCLogbar:
         flush: bool = False,
         linebreak: bool = False,
     ):
-        self.now = get_now()
-
         if count is not None:
             self.count = count
         elif increment is not None:
@@ -314,23 +463,52 @@ class TCLogbar:
         else:
             pass
 
-        if self.is_num(self.total) and self.is_num(self.count) and self.total > 0:
-            self.percent_float = self.count / self.total * 100
+        if self.render_thread is None:
+            # positional args, as this is called per iteration
+            self.refresh(head, desc, remain_seconds, flush, linebreak)
+        elif flush or linebreak or remain_seconds is not None:
+            with self.lock:
+                self.refresh(
+                    head=head,
+                    desc=desc,
+                    remain_seconds=remain_seconds,
+                    flush=flush,
+                    linebreak=linebreak,
+                )
+        else:
+            # render thread would redraw
+            if head is not None:
+                self.head = head
+            if desc is not None:
+                self.desc = desc
+
+    def refresh(
+        self,
+        head: str = None,
+        desc: str = None,
+        remain_seconds: float = None,
+        flush: bool = False,
+        linebreak: bool = False,
+        force: bool = False,
+    ):
+        """Redraw bar if flush is due (or force), with current count."""
+        self.now = time.perf_counter()
+
+        total, count = self.total, self.count
+        if isinstance(total, NUM_TYPES) and isinstance(count, NUM_TYPES) and total > 0:
+            self.percent_float = count / total * 100
             self.percent = int(self.percent_float)
+            if self.percent_float >= 100 or self.percent_float <= 0:
+                # use high but throttled flush rate when "exceed" complete
+                self.flush_interval = 0.001
         else:
             self.percent_float = None
             self.percent = None
 
-        if flush is True:
-            pass
-
-        if self.is_num(self.percent_float) and (
-            self.percent_float >= 100 or self.percent_float <= 0
-        ):
-            # use high but throttled flush rate when "exceed" complete
-            self.flush_interval = 0.001
-
-        if self.flush_interval is not None:
+        if force:
+            flush = True
+            self.flush_t = self.now
+        elif self.flush_interval is not None:
             if self._should_flush():
                 flush = True
                 self.flush_t = self.now
@@ -370,6 +548,43 @@ class TCLogbar:
             if linebreak:
                 self.linebreak()
 
+    def wrap(self, iterable: Iterable, total: int = None) -> Iterator:
+        """Yield items of iterable, and add count of items to bar.
+
+        - total: if None, use len(iterable) if it has one, else keep `self.total`
+
+        Items are counted in chunks of `miniters`, which is re-estimated after each
+        chunk from iteration rate, so a chunk takes about 1/4 of `flush_interval`.
+        Final count is drawn when iteration ends (or breaks).
+        """
+        if total is None:
+            try:
+                total = len(iterable)
+            except TypeError:
+                pass
+        if total is not None:
+            self.total = total
+        chunk_seconds = (self.flush_interval or 0.1) / 4
+        miniters = 1
+        n = 0
+        chunk_t = time.perf_counter()
+        try:
+            for item in iterable:
+                yield item
+                n += 1
+                if n >= miniters:
+                    self.update(n)
+                    now = time.perf_counter()
+                    dt = now - chunk_t
+                    if dt > 0:
+                        miniters = max(int(n * chunk_seconds / dt), 1)
+                    chunk_t = now
+                    n = 0
+        finally:
+            if n:
+                self.update(n)
+            self.flush_final()
+
     def construct_grid_str(self):
         if self.grid_mode == "shade":
             grids = self.grid_shades
@@ -383,6 +598,14 @@ class TCLogbar:
                 int(((count_total_col) - int(count_total_col)) * (len(grids) - 1)),
                 len(grids) - 2,
             )
+            grid_key = (grids, self.cols, self.percent, full_grid_cols, active_grid_idx)
+        else:
+            grid_key = (grids, self.cols)
+        # grid changes only every few percents, so reuse last one
+        if grid_key == self.grid_key:
+            return self.grid_str
+
+        if self.percent is not None:
             if active_grid_idx < 1:
                 active_grid_str = ""
             else:
@@ -399,37 +622,98 @@ class TCLogbar:
         else:
             grid_str = self.cols * grids[0]
 
+        self.grid_key = grid_key
+        self.grid_str = grid_str
         return grid_str
 
+    def fit_cols(self, rest_width: int):
+        """Resize grid to fill one terminal line. Grid only shrinks when line
+        overflows, and is re-fitted when terminal is resized, so it does not jitter
+        with widths of other segments."""
+        columns = get_terminal_columns(fallback=120)
+        if columns != self.fit_columns or rest_width + self.cols >= columns:
+            self.fit_columns = columns
+            self.cols = max(columns - rest_width - 1, MIN_AUTO_COLS)
+
+    def construct_static_segs(self):
+        """Segments that only change with head, desc, total and show options."""
+        if self.head:
+            head_str = f"{self.head}"
+        else:
+            head_str = ""
+
+        if self.desc:
+            desc_str = f"{self.desc}"
+            if self.head or self.show_datetime:
+                desc_str = f" {desc_str}"
+        else:
+            desc_str = ""
+
+        if self.is_num(self.total):
+            total_bits = int_bits(self.total)
+            total_str = str(self.total)
+        else:
+            total_bits = 0
+            total_str = "?"
+
+        # visible width of static segments and separators, head and desc may be colored
+        static_width = (
+            len(decolored(head_str)) + len(decolored(desc_str)) + len(total_str) + 12
+        )
+        if self.show_color:
+            total_str = logstr.mesg(total_str)
+        self.static_segs = (head_str, desc_str, total_str, total_bits, static_width)
+
+    def color_seg(self, name: str, text: str, color_key: int, color_func) -> str:
+        """Colored text of segment, re-colored only when text or color changes."""
+        seg = self.colored_segs.get(name)
+        if seg is None or seg[0] != text or seg[1] != color_key:
+            seg = (text, color_key, color_func(text))
+            self.colored_segs[name] = seg
+        return seg[2]
+
     def construct_bar_str(self):
+        static_key = (
+            self.head,
+            self.desc,
+            self.total,
+            self.show_datetime,
+            self.show_color,
+        )
+        if static_key != self.static_key:
+            self.static_key = static_key
+            self.construct_static_segs()
+            self.colored_segs.clear()
+        head_str, desc_str, total_str, total_bits, static_width = self.static_segs
+
         if self.show_datetime:
-            now_str = f"[{t_to_str(self.now)}]"
+            now_str = f"[{t_to_str(get_now())}]"
             if self.head:
                 now_str = f" {now_str}"
         else:
             now_str = ""
 
-        elapsed_str = dt_to_str(self.dt)
+        # elapsed_str and remain_str only change every second
+        elapsed_key = int(self.dt)
+        if elapsed_key != self.elapsed_key:
+            self.elapsed_key = elapsed_key
+            self.elapsed_str = dt_to_str(self.dt)
+        elapsed_str = self.elapsed_str
 
         if self.percent is not None:
             percent_str = f"{self.percent:>3}%"
         else:
             percent_str = f"{'?':>3}%"
 
-        grid_str = self.construct_grid_str()
-
         if self.remain_seconds is not None:
-            remain_str = dt_to_str(self.remain_seconds)
+            remain_key = int(self.remain_seconds)
+            if remain_key != self.remain_key:
+                self.remain_key = remain_key
+                self.remain_str = dt_to_str(self.remain_seconds)
+            remain_str = self.remain_str
         else:
             remain_str = "??:??"
 
-        if self.is_num(self.total):
-            total_bits = int_bits(self.total)
-            total_str = str(self.total)
-        else:
-            total_bits = 0
-            total_str = "?"
-
         if self.is_num(self.count):
             count_str = f"{self.count:_>{total_bits}}"
         else:
@@ -445,17 +729,20 @@ class TCLogbar:
         else:
             iter_per_second_str = ""
 
-        if self.head:
-            head_str = f"{self.head}"
-        else:
-            head_str = ""
-
-        if self.desc:
-            desc_str = f"{self.desc}"
-            if self.head or self.show_datetime:
-                desc_str = f" {desc_str}"
-        else:
-            desc_str = ""
+        # visible width of segments and separators other than grid
+        rest_width = (
+            static_width
+            + len(now_str)
+            + len(percent_str)
+            + len(count_str)
+            + len(elapsed_str)
+            + len(remain_str)
+            + len(iter_per_second_str)
+        )
+        if self.auto_cols:
+            self.fit_cols(rest_width)
+        grid_str = self.construct_grid_str()
+        self.bar_width = rest_width + self.cols
 
         if self.show_color:
             if not self.is_num(self.percent):
@@ -463,13 +750,13 @@ class TCLogbar:
             else:
                 progress_logstr_key = min(self.percent // 25 * 25, 100)
             logstr_progress = self.PROGRESS_LOGSTR[progress_logstr_key]
+            key = progress_logstr_key
             count_str = logstr_progress(count_str)
-            total_str = logstr.mesg(total_str)
             now_str = logstr.mesg(now_str)
-            percent_str = logstr_progress(percent_str)
-            grid_str = logstr_progress(grid_str)
-            elapsed_str = logstr.mesg(elapsed_str)
-            remain_str = logstr_progress(remain_str)
+            percent_str = self.color_seg("percent", percent_str, key, logstr_progress)
+            grid_str = self.color_seg("grid", grid_str, key, logstr_progress)
+            elapsed_str = self.color_seg("elapsed", elapsed_str, 0, logstr.mesg)
+            remain_str = self.color_seg("remain", remain_str, key, logstr_progress)
             iter_per_second_str = logstr.mesg(iter_per_second_str)
 
         self.bar_str = (
@@ -483,12 +770,15 @@ class TCLogbar:
         )
 
     def reset(self, linebreak: bool = False):
-        if linebreak:
-            self.linebreak()
-        self.count = 0
-        self.start_t = get_now()
-        if self.window:
-            self.window.reset_window(self.start_t, self.count)
+        with self.lock:
+            if linebreak:
+                self.linebreak()
+            self.count = 0
+            self.start_t = time.perf_counter()
+            self.invalidate()
+            self.plain_next_percent = 0
+            if self.window:
+                self.window.reset_window(self.start_t, self.count)
 
     def set_cols(self, cols: int = None):
         self.cols = cols
@@ -519,60 +809,90 @@ class TCLogbar:
 
 
 class TCLogbarGroup:
+    """Bars in group post their rendered strings to `pending` without lock,
+    and a single renderer (whoever gets the lock) composes cursor moves, erases
+    and contents of all pending bars, then writes them in one call."""
+
     def __init__(
         self, bars: list[TCLogbar], show_at_init: bool = True, verbose: bool = True
     ):
         self.bars = bars
         self.show_at_init = show_at_init
         self.verbose = verbose
-        self.cursor = CursorController(flush=True)
+        self.cursor = CursorController(write=False)
         self.lock = threading.Lock()
+        # node_idx -> (msg, line_height)
+        self.pending: dict[int, tuple[str, int]] = {}
         self.init_bars()
 
     def init_bars(self):
         for idx, bar in enumerate(self.bars):
             bar.group = self
             bar.node_idx = idx
+            bar.invalidate()
         self.log_node_idx = None
-        self.total_line_height = 0
-        for bar in self.bars:
-            self.total_line_height += bar.line_height
+        # line heights of drawn contents, used to move cursor between bars
+        self.line_heights = [bar.line_height for bar in self.bars]
+        self.total_line_height = sum(self.line_heights)
         if self.show_at_init:
             for bar in self.bars:
                 bar.update(flush=True)
 
     def write(self, msg: str, flush: bool = True):
         with self.lock:
-            sys.stdout.write(msg)
             # Clear from cursor to end of line to remove any trailing remnants
-            sys.stdout.write("\033[0K")
+            sys.stdout.write(f"{msg}\033[0K")
             if flush:
                 sys.stdout.flush()
 
-    def move_cursor(self, node_idx: int):
+    def post(self, node_idx: int, msg: str, line_height: int = 1):
+        """Set latest content of bar, and render if no other thread is rendering."""
+        self.pending[node_idx] = (msg, line_height)
+        self.render()
+
+    def render(self):
+        # re-check after release, for contents posted while lock was held by others
+        while self.pending:
+            if not self.lock.acquire(blocking=False):
+                return
+            try:
+                strs = []
+                for node_idx in sorted(list(self.pending)):
+                    msg, line_height = self.pending.pop(node_idx)
+                    strs.append(self.move_cursor(node_idx))
+                    strs.append(f"{msg}\033[0K")
+                    self.line_heights[node_idx] = line_height
+                sys.stdout.write("".join(strs))
+                sys.stdout.flush()
+            finally:
+                self.lock.release()
+
+    def move_cursor(self, node_idx: int) -> str:
+        move_str = ""
         # prepare blank area for logbars
         if self.log_node_idx is None:
-            self.write(self.total_line_height * "\n")
-            self.cursor.move(row=self.total_line_height)
-            self.cursor.move_to_beg()
+            move_str += self.total_line_height * "\n"
+            move_str += self.cursor.move(row=self.total_line_height)
+            move_str += self.cursor.move_to_beg()
             self.log_node_idx = 0
 
         if node_idx > self.log_node_idx:
             down_rows = 1  # from last line end to next line beg
-            for node in self.bars[self.log_node_idx + 1 : node_idx]:
-                down_rows += node.line_height
-            self.cursor.move(row=-down_rows)
+            for line_height in self.line_heights[self.log_node_idx + 1 : node_idx]:
+                down_rows += line_height
+            move_str += self.cursor.move(row=-down_rows)
         elif node_idx < self.log_node_idx:
             up_rows = 0
-            for node in self.bars[node_idx : self.log_node_idx + 1]:
-                up_rows += node.line_height
+            for line_height in self.line_heights[node_idx : self.log_node_idx + 1]:
+                up_rows += line_height
             up_rows -= 1  # as previous cursor already at last line end of previous node
-            self.cursor.move(row=up_rows)
+            move_str += self.cursor.move(row=up_rows)
         else:
-            up_rows = self.bars[node_idx].line_height - 1
-            self.cursor.move(row=up_rows)
+            up_rows = self.line_heights[node_idx] - 1
+            move_str += self.cursor.move(row=up_rows)
 
         # Move to beginning of line first, then erase entire line
-        self.cursor.move_to_beg()
-        self.cursor.erase_line("beg_to_end")
+        move_str += self.cursor.move_to_beg()
+        move_str += self.cursor.erase_line("beg_to_end")
         self.log_node_idx = node_idx
+        return move_str
@@ -111,6 +111,10 @@ RE_COLORED = (
 RE_ANSI_ESCAPE = r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"
 
 
+# (color, bg_color, fonts) -> (prefix, suffix) escapes
+COLOR_SPECS: dict[tuple, tuple[str, str]] = {}
+
+
 def color_text_with_ints(text: str, color_ints: list[int]) -> str:
     if color_ints:
         color_ints_str = ";".join(map(str, color_ints))
@@ -120,16 +124,18 @@ def color_text_with_ints(text: str, color_ints: list[int]) -> str:
     return res
 
 
-def colored(
-    text: str,
+def get_color_spec(
     color: COLOR_TYPE = None,
     bg_color: BG_COLOR_TYPE = None,
     fonts: Union[FONT_TYPE, Iterable[FONT_TYPE]] = None,
-) -> str:
-    text = str(text)
-
-    if not color and not bg_color and not fonts:
-        return text
+) -> tuple[str, str]:
+    """Get cached (prefix, suffix) escapes of color spec."""
+    if fonts is not None and not isinstance(fonts, str):
+        fonts = tuple(fonts)
+    key = (color, bg_color, fonts)
+    spec = COLOR_SPECS.get(key)
+    if spec is not None:
+        return spec
 
     color_ints = []
     if color:
@@ -142,27 +148,55 @@ def colored(
         else:
             color_ints.extend([FONTS[font] for font in fonts])
 
-    # handle nested colored text
-    matches = re.finditer(RE_COLORED, text)
-    if matches:
-        res = ""
-        prev_end = 0
-        for match in matches:
-            start = match.start()
-            end = match.end()
-            if start > prev_end:
-                res += color_text_with_ints(text[prev_end:start], color_ints)
-            res += match.group("colored_text")
-            prev_end = end
-        if prev_end < len(text):
-            res += color_text_with_ints(text[prev_end:], color_ints)
+    if color_ints:
+        spec = (f"\033[{';'.join(map(str, color_ints))}m", COLOR_RESET)
     else:
-        res = color_text_with_ints(text, color_ints)
+        spec = ("", "")
+    COLOR_SPECS[key] = spec
+    return spec
+
 
+def colored_by_spec(text: str, spec: tuple[str, str]) -> str:
+    prefix, suffix = spec
+    if not text or not prefix:
+        return text
+    # fast path: no nested colored text
+    if "\033" not in text:
+        return prefix + text + suffix
+
+    # handle nested colored text
+    res = ""
+    prev_end = 0
+    for match in re.finditer(RE_COLORED, text):
+        start = match.start()
+        end = match.end()
+        if start > prev_end:
+            res += prefix + text[prev_end:start] + suffix
+        res += match.group("colored_text")
+        prev_end = end
+    if prev_end < len(text):
+        res += prefix + text[prev_end:] + suffix
     return res
 
 
+def colored(
+    text: str,
+    color: COLOR_TYPE = None,
+    bg_color: BG_COLOR_TYPE = None,
+    fonts: Union[FONT_TYPE, Iterable[FONT_TYPE]] = None,
+) -> str:
+    if type(text) is not str:
+        text = str(text)
+
+    if not color and not bg_color and not fonts:
+        return text
+
+    return colored_by_spec(text, get_color_spec(color, bg_color, fonts))
+
+
 def decolored(text: str) -> str:
     if not isinstance(text, str):
         return text
+    if "\033" not in text:
+        return text
     return re.sub(RE_ANSI_ESCAPE, "", text)
@@ -0,0 +1,163 @@
+"""Progress counters in shared memory, for bars of work in other processes"""
+
+import os
+import sys
+import threading
+
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .bars import TCLogbar
+from .forks import register_exit_hook, unregister_exit_hook
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """Attach to existing shared memory, without owning its lifetime."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # before 3.13, attaching also registers segment to resource tracker, which is
+    # fine if tracker is inherited from owner (forked or spawned children),
+    # but a new tracker of unrelated process would unlink segment when it exits
+    tracker = getattr(resource_tracker, "_resource_tracker", None)
+    is_new_tracker = getattr(tracker, "_fd", None) is None
+    shm = SharedMemory(name=name)
+    if is_new_tracker:
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+class SharedCounters:
+    """Array of int64 counters in shared memory, one slot per writer (worker or task).
+
+    Created in parent, and passed to workers as task args (or initargs), where it is
+    pickled by name of shared memory, and attached to same counters.
+    Each slot must be incremented by only one process at a time, so no lock
+    or per-item IPC is needed; parent only reads counts, e.g., by
+    SharedCountersPoller, which feeds them to bars.
+
+    Parent (creator) owns the memory, which is unlinked by close() or at exit.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.shm = SharedMemory(create=True, size=max(size, 1) * 8)
+        self.owner_pid = os.getpid()
+        self.counts = self.shm.buf.cast("q")
+        for slot in range(size):
+            self.counts[slot] = 0
+        register_exit_hook(self, self.close)
+
+    @classmethod
+    def attach(cls, name: str, size: int) -> "SharedCounters":
+        counters = cls.__new__(cls)
+        counters.size = size
+        counters.shm = attach_shared_memory(name)
+        counters.owner_pid = None
+        counters.counts = counters.shm.buf.cast("q")
+        return counters
+
+    def __reduce__(self):
+        return (self.attach, (self.name, self.size))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def is_owner(self) -> bool:
+        # forked children also have a copy of owner object
+        return self.owner_pid == os.getpid()
+
+    def add(self, slot: int, increment: int = 1):
+        self.counts[slot] += increment
+
+    def set(self, slot: int, count: int):
+        self.counts[slot] = count
+
+    def get_counts(self) -> list[int]:
+        return self.counts[: self.size].tolist()
+
+    def close(self):
+        if self.counts is None:
+            return
+        # memory can not be closed while its buffer is exported
+        self.counts.release()
+        self.counts = None
+        self.shm.close()
+        if self.is_owner():
+            self.shm.unlink()
+            unregister_exit_hook(self, self.close)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SharedCountersPoller:
+    """Read SharedCounters in a parent thread, every `interval` seconds,
+    and set counts of bars, so progress of workers is drawn without IPC.
+
+    - bars: bar of each slot, in slot order; None to only show total
+    - total_bar: bar of sum of all slots
+
+    Put bars into a TCLogbarGroup to draw them together.
+    Call close() (or use `with`) to stop polling and draw final counts.
+    """
+
+    def __init__(
+        self,
+        counters: SharedCounters,
+        bars: list[TCLogbar] = None,
+        total_bar: TCLogbar = None,
+        interval: float = 0.1,
+    ):
+        self.counters = counters
+        self.bars = bars or []
+        self.total_bar = total_bar
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name="SharedCountersPoller", daemon=True
+        )
+        self.thread.start()
+
+    def poll(self):
+        counts = self.counters.get_counts()
+        for bar, count in zip(self.bars, counts):
+            if count != bar.count:
+                bar.update(count=count)
+        if self.total_bar is not None:
+            total_count = sum(counts)
+            if total_count != self.total_bar.count:
+                self.total_bar.update(count=total_count)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+    def close(self):
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.poll()
+        for bar in self.bars:
+            bar.flush_final()
+        if self.total_bar is not None:
+            self.total_bar.flush_final()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
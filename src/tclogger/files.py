@@ -1,22 +1,41 @@
 import threading
+import weakref
 
 from pathlib import Path
 from typing import Literal, Union
 
 from .times import get_now_str
+from .sinks import FileSink, COMPRESS_TYPE
 
 
 MSG_PREFIXES = {"note": ">", "error": "×", "success": "√"}
 
 
 class FileLogger:
-    def __init__(self, log_path: Union[str, Path], lock: threading.Lock = None):
+    def __init__(
+        self,
+        log_path: Union[str, Path],
+        lock: threading.Lock = None,
+        max_bytes: int = None,
+        rotate_interval: float = None,
+        backup_count: int = None,
+        compress: COMPRESS_TYPE = None,
+    ):
         if not isinstance(log_path, Path):
             log_path = Path(log_path)
         self.log_path = log_path
         if not self.log_path.parent.exists():
             self.log_path.parent.mkdir(parents=True, exist_ok=True)
         self.lock = lock or threading.Lock()
+        self.sink = FileSink(
+            self.log_path,
+            max_bytes=max_bytes,
+            rotate_interval=rotate_interval,
+            backup_count=backup_count,
+            compress=compress,
+        )
+        # close file handle when logger is collected
+        self.finalizer = weakref.finalize(self, self.sink.close)
 
     def log(
         self,
@@ -37,5 +56,7 @@ class FileLogger:
         else:
             line = f"{prefix_str}{msg}\n"
         with self.lock:
-            with open(self.log_path, "a") as f:
-                f.write(line)
+            self.sink.write(line)
+
+    def close(self):
+        self.finalizer()
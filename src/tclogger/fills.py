@@ -1,9 +1,8 @@
-import shutil
-
 from typing import Union, Literal
 
 from .maths import chars_len
 from .colors import colored, decolored, COLOR_TYPE
+from .terminals import get_terminal_columns
 
 
 def fill_to_len(filler: str, length: int) -> str:
@@ -23,7 +22,7 @@ def add_fills(
     total_width: int = None,
 ):
     if not total_width:
-        total_width = shutil.get_terminal_size().columns
+        total_width = get_terminal_columns()
     if not text:
         filled_str = colored(fill_to_len(filler, total_width), color=fill_color)
         return filled_str
@@ -0,0 +1,84 @@
+"""Per-call-site rate limiting and sampling of log records"""
+
+import random
+import threading
+import time
+
+from pathlib import Path
+from types import FrameType
+
+
+class TCLogFilter:
+    """Decide whether a log call is emitted, before its msg is rendered.
+
+    Records are counted per (method, call site), where call site is the
+    (code, lineno) of caller frame. A record is emitted only if it passes all
+    configured modes:
+    - every_n: emit 1st, (n+1)th, (2n+1)th, ... records
+    - sample_rate: emit with this probability, in (0, 1]
+    - rate_limit: emit at most this many records per second
+
+    Counts of suppressed records are summarized by TCLogger `summary_interval`
+    seconds after a record is suppressed, and on flush, close or exit,
+    like "suppressed 48213 similar mesg records".
+    """
+
+    def __init__(
+        self,
+        rate_limit: float = None,
+        sample_rate: float = None,
+        every_n: int = None,
+        summary_interval: float = 10.0,
+        methods: list[str] = None,
+    ):
+        self.rate_limit = rate_limit
+        self.sample_rate = sample_rate
+        self.every_n = every_n
+        self.summary_interval = summary_interval
+        self.methods = set(methods) if methods is not None else None
+        # (method, code, lineno) -> [seen, window_beg, window_count, suppressed]
+        self.sites: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def check(self, method: str, frame: FrameType) -> bool:
+        """Return False if record should be suppressed."""
+        if self.methods is not None and method not in self.methods:
+            return True
+        key = (method, frame.f_code, frame.f_lineno)
+        # counts of same site may be updated by many threads
+        with self.lock:
+            state = self.sites.get(key)
+            if state is None:
+                state = self.sites.setdefault(key, [0, 0.0, 0, 0])
+            state[0] += 1
+            is_passed = True
+            if self.every_n and (state[0] - 1) % self.every_n:
+                is_passed = False
+            elif self.sample_rate is not None and random.random() >= self.sample_rate:
+                is_passed = False
+            elif self.rate_limit is not None:
+                now_t = time.monotonic()
+                if now_t - state[1] >= 1.0:
+                    state[1] = now_t
+                    state[2] = 0
+                if state[2] >= self.rate_limit:
+                    is_passed = False
+                else:
+                    state[2] += 1
+            if not is_passed:
+                state[3] += 1
+            return is_passed
+
+    def pop_summaries(self) -> list[tuple[str, str]]:
+        """Return list of (method, summary msg), and reset suppressed counts."""
+        with self.lock:
+            summaries = []
+            for (method, code, lineno), state in list(self.sites.items()):
+                suppressed = state[3]
+                if suppressed <= 0:
+                    continue
+                state[3] = 0
+                site = f"{Path(code.co_filename).name}:{lineno}"
+                msg = f"suppressed {suppressed} similar {method} records (at {site})"
+                summaries.append((method, msg))
+            return summaries
@@ -0,0 +1,74 @@
+"""Hooks to keep background writers consistent across process exit and fork"""
+
+import atexit
+import os
+import sys
+import traceback
+import weakref
+
+from multiprocessing import util as mp_util
+
+FORK_RESET_OBJS = weakref.WeakSet()
+# obj -> list of unbound methods, objs are held weakly so they can be collected
+EXIT_HOOK_OBJS = weakref.WeakKeyDictionary()
+
+
+def register_exit_hook(obj, func):
+    """Call func (a bound method of obj) at exit of current process,
+    if obj is still alive then.
+
+    Only a weak reference to obj is kept, so registered objs can still be collected,
+    and obj should release its resources (threads, files) in close() or __del__().
+    """
+    funcs = EXIT_HOOK_OBJS.setdefault(obj, [])
+    if func.__func__ not in funcs:
+        funcs.append(func.__func__)
+
+
+def unregister_exit_hook(obj, func):
+    funcs = EXIT_HOOK_OBJS.get(obj)
+    if funcs and func.__func__ in funcs:
+        funcs.remove(func.__func__)
+
+
+def run_exit_hooks():
+    """Objs registered later are closed first, e.g., queues before their sinks.
+    Hooks registered by running hooks (e.g., compressing files rotated on close)
+    are also run."""
+    while EXIT_HOOK_OBJS:
+        items = list(EXIT_HOOK_OBJS.items())
+        EXIT_HOOK_OBJS.clear()
+        for obj, funcs in reversed(items):
+            for func in funcs:
+                try:
+                    func(obj)
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+
+
+class ExitHooksFinalizer:
+    """multiprocessing children exit with os._exit() and skip atexit,
+    so exit hooks also run as multiprocessing finalizer in each child."""
+
+    def register_finalizer(self):
+        mp_util.Finalize(None, run_exit_hooks, exitpriority=10)
+
+
+EXIT_HOOKS_FINALIZER = ExitHooksFinalizer()
+atexit.register(run_exit_hooks)
+mp_util.register_after_fork(EXIT_HOOKS_FINALIZER, ExitHooksFinalizer.register_finalizer)
+
+
+def register_fork_reset(obj):
+    """Call obj.reset_after_fork() in child process after fork,
+    where locks may be held by dead threads and buffers are copies of parent's."""
+    FORK_RESET_OBJS.add(obj)
+
+
+def reset_after_fork():
+    for obj in list(FORK_RESET_OBJS):
+        obj.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
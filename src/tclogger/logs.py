@@ -1,13 +1,28 @@
+import functools
 import logging
+import sys
+import threading
+import time
+import traceback
+import types
 
+from contextvars import ContextVar
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import Iterable, Literal
+from zoneinfo import ZoneInfo
 
 from .types import PathType
 from .colors import colored, decolored, COLOR_TYPE
+from .colors import get_color_spec, colored_by_spec
 from .fills import add_fills
-from .times import get_now
+from . import times
+from .queues import TCLogQueue, OVERFLOW_TYPE
+from .sinks import LogSink, ConsoleSink, FileSink, JsonlSink, RingSink
+from .sinks import COMPRESS_TYPE
+from .filters import TCLogFilter
+from .forks import register_exit_hook
 
 LOG_METHOD_COLORS = {
     "err": ("error", "red"),
@@ -26,6 +41,19 @@ LOG_METHOD_COLORS = {
     "dbug": ("debug", "dark_grey"),
 }
 
+# bit of each method in TCLogger.log_bits, which marks enabled methods
+LOG_METHOD_BITS = {method: 1 << idx for idx, method in enumerate(LOG_METHOD_COLORS)}
+
+ALL_LOG_METHOD_BITS = sum(LOG_METHOD_BITS.values())
+# methods of error level or above, which dump buffered records of ring sink
+RING_DUMP_METHODS = [
+    method
+    for method, (level, color) in LOG_METHOD_COLORS.items()
+    if level in ("error", "critical")
+]
+
+LAZY_MSG_TYPES = (types.FunctionType, types.MethodType, functools.partial)
+
 LOG_METHOD_BG_COLORS = {
     "glow": "bg_blue",
 }
@@ -34,15 +62,24 @@ LOG_METHOD_BG_COLORS = {
 class TCLogstr:
     def __init__(self):
         self.COLORS = {k: v[1] for k, v in LOG_METHOD_COLORS.items()}
+        self.SPECS = {
+            k: get_color_spec(v, LOG_METHOD_BG_COLORS.get(k, None))
+            for k, v in self.COLORS.items()
+        }
 
     def colored_str(self, msg, method, *args, **kwargs):
-        return colored(
-            msg,
-            color=self.COLORS[method.lower()],
-            bg_color=LOG_METHOD_BG_COLORS.get(method, None),
-            *args,
-            **kwargs,
-        )
+        spec = self.SPECS.get(method)
+        if spec is None or args or kwargs:
+            return colored(
+                msg,
+                color=self.COLORS[method.lower()],
+                bg_color=LOG_METHOD_BG_COLORS.get(method, None),
+                *args,
+                **kwargs,
+            )
+        if type(msg) is not str:
+            msg = str(msg)
+        return colored_by_spec(msg, spec)
 
     def err(self, msg: str = ""):
         return self.colored_str(msg, "err")
@@ -109,6 +146,89 @@ class TCLogclr:
 logclr = TCLogclr()
 
 
+@dataclass
+class TCLogRecord:
+    """Record of one log call, with plain segments and the method to color them,
+    so colored and plain texts are both rendered from segments,
+    and plain text needs no decolored() regex over colored text.
+
+    - prefix: (colored_head, time_str, colored_tail) of prefix, None if no prefix
+    - msg_lines: lines of msg, which are None if record needs no text
+    - fill_side: side to add fills, None if no fill
+    """
+
+    method: str
+    level: str
+    msg_lines: list[str] = None
+    prefix: tuple[str, str, str] = None
+    indent_str: str = ""
+    is_at_beg: bool = True
+    is_colored: bool = True
+    fill_side: str = None
+    end: str = "\n"
+    verbose: bool = True
+    use_file: bool = False
+    args: tuple = ()
+    kwargs: dict = None
+    jsonl_record: dict = None
+
+
+class ContextLogBits:
+    """log_bits of current context, used after any context has set its own level.
+    Before that, log_bits is a plain instance attribute of base level, which is
+    faster to read, and shadows this non-data descriptor."""
+
+    def __get__(self, logger: "TCLogger", owner=None) -> int:
+        if logger is None:
+            return self
+        level_state = logger.log_level_var.get()
+        if level_state is None:
+            return logger.base_log_bits | logger.capture_bits
+        return level_state[1] | logger.capture_bits
+
+
+class TCLogHandler(logging.Handler):
+    """Forward records of stdlib logging API (e.g., logger.info(), logger.error())
+    to sinks of TCLogger, which would otherwise have no handler.
+    Records are added like those of TCLogger methods, so they keep order with
+    batches and async queue, and are written as they are (without colors)."""
+
+    # method of TCLogRecord for each level, used by ring dump and jsonl sinks
+    LEVEL_METHODS = {
+        "critical": "fail",
+        "error": "erro",
+        "warning": "warn",
+        "info": "mesg",
+        "debug": "dbug",
+    }
+
+    def __init__(self, logger: "TCLogger"):
+        super().__init__()
+        self.tclogger = logger
+
+    def get_level(self, levelno: int) -> str:
+        for level, level_no in self.tclogger.LEVEL_NAMES.items():
+            if levelno >= level_no:
+                return level
+        return "debug"
+
+    def emit(self, record: logging.LogRecord):
+        tclogger = self.tclogger
+        try:
+            level = self.get_level(record.levelno)
+            log_record = TCLogRecord(
+                method=self.LEVEL_METHODS[level],
+                level=level,
+                msg_lines=self.format(record).split("\n"),
+                is_colored=False,
+                verbose=tclogger.verbose,
+                use_file=tclogger.use_file,
+            )
+            tclogger.add_records([log_record])
+        except Exception:
+            self.handleError(record)
+
+
 class TCLogger(logging.Logger):
     INDENT_METHODS = [
         "indent",
@@ -143,7 +263,27 @@ class TCLogger(logging.Logger):
         use_file: bool = False,
         file_path: PathType = None,
         file_mode: Literal["a", "w"] = "a",
+        file_buffer_size: int = 0,
+        file_flush_interval: float = 1.0,
+        file_max_bytes: int = None,
+        file_rotate_interval: float = None,
+        file_backup_count: int = None,
+        file_compress: COMPRESS_TYPE = None,
+        file_process_safe: bool = False,
+        use_jsonl: bool = False,
+        jsonl_path: PathType = None,
         verbose: bool = True,
+        use_async: bool = False,
+        async_queue_size: int = 10000,
+        async_batch_size: int = 256,
+        async_overflow: OVERFLOW_TYPE = "block",
+        filter_rate_limit: float = None,
+        filter_sample_rate: float = None,
+        filter_every_n: int = None,
+        filter_summary_interval: float = 10.0,
+        use_dedup: bool = False,
+        dedup_timeout: float = 5.0,
+        ring_size: int = None,
     ):
         self.name = str(name) if name is not None else "TCLogger"
         self.use_prefix = use_prefix
@@ -152,19 +292,428 @@ class TCLogger(logging.Logger):
         self.use_file = use_file
         self.file_path = file_path
         self.file_mode = file_mode
+        self.file_buffer_size = file_buffer_size
+        self.file_flush_interval = file_flush_interval
+        self.file_max_bytes = file_max_bytes
+        self.file_rotate_interval = file_rotate_interval
+        self.file_backup_count = file_backup_count
+        self.file_compress = file_compress
+        self.file_process_safe = file_process_safe
+        self.use_jsonl = use_jsonl
+        self.jsonl_path = jsonl_path
         self.verbose = verbose
+        self.use_async = use_async
+        self.async_queue_size = async_queue_size
+        self.async_batch_size = async_batch_size
+        self.async_overflow = async_overflow
+        self.use_dedup = use_dedup
+        self.dedup_timeout = dedup_timeout
+        self.ring_size = ring_size
         self.init_file_path()
+        self.init_ring_sink()
+        self.filter_timer: threading.Timer = None
+        self.filter_timer_lock = threading.Lock()
+        self.set_filter(
+            rate_limit=filter_rate_limit,
+            sample_rate=filter_sample_rate,
+            every_n=filter_every_n,
+            summary_interval=filter_summary_interval,
+        )
 
         super().__init__(self.name)
         self.setLevel(logging.INFO)
-        stream_handler = logging.StreamHandler()
-        stream_handler.setLevel(logging.INFO)
-        self.addHandler(stream_handler)
-        self.log_indent = 0
-        self.log_indents = []
-        self.log_level = "info"
-        self.log_levels = []
-        self.is_at_beg = True
+        self.init_context_states()
+        self.init_sinks()
+        self.prefix_sec_cache = (None, None, "")
+        self.prefix_fragments = {}
+        self.init_log_queue()
+        self.async_logger = None
+        self.init_dedup_states()
+        # summaries pending in filter (and dedup) are written at exit
+        register_exit_hook(self, self.flush)
+
+    def init_context_states(self):
+        """Indent, level and line states are context-local (via contextvars),
+        so threads and asyncio tasks sharing this logger do not corrupt each other.
+        New threads start with no context values, so they use defaults:
+        - indent: 0
+        - level: base_log_level, which is set by set_level() in main thread
+        """
+        self.base_log_level = "info"
+        self.base_log_bits = self.get_log_bits(self.base_log_level)
+        self.capture_bits = 0
+        # set when any context (other than root) has its own level
+        self.has_context_level = False
+        # guards has_context_level and log_bits attribute, so a context setting
+        # its level can not be overwritten by a stale log_bits of base level
+        self.log_bits_lock = threading.Lock()
+        self.log_indent_var = ContextVar(f"{self.name}.log_indent", default=0)
+        self.log_indents_var = ContextVar(f"{self.name}.log_indents", default=())
+        # (log_level, log_bits)
+        self.log_level_var = ContextVar(f"{self.name}.log_level", default=None)
+        self.log_levels_var = ContextVar(f"{self.name}.log_levels", default=())
+        self.is_at_beg_var = ContextVar(f"{self.name}.is_at_beg", default=True)
+        self.batch_var = ContextVar(f"{self.name}.batch", default=None)
+
+    @property
+    def log_indent(self) -> int:
+        return self.log_indent_var.get()
+
+    @log_indent.setter
+    def log_indent(self, indent: int):
+        self.log_indent_var.set(indent)
+
+    @property
+    def log_indents(self) -> list[int]:
+        return list(self.log_indents_var.get())
+
+    @property
+    def log_level(self) -> str:
+        level_state = self.log_level_var.get()
+        if level_state is None:
+            return self.base_log_level
+        return level_state[0]
+
+    @log_level.setter
+    def log_level(self, level: str):
+        self.log_level_var.set((level, self.get_log_bits(level)))
+        with self.log_bits_lock:
+            self.has_context_level = True
+            self.__dict__.pop("log_bits", None)
+
+    @property
+    def log_levels(self) -> list[str]:
+        return list(self.log_levels_var.get())
+
+    # methods to pass to route_log(), include all methods if ring sink is on
+    log_bits = ContextLogBits()
+
+    def update_log_bits(self):
+        with self.log_bits_lock:
+            if self.has_context_level:
+                self.__dict__.pop("log_bits", None)
+            else:
+                self.log_bits = self.base_log_bits | self.capture_bits
+
+    @property
+    def level_bits(self) -> int:
+        """Methods enabled by log_level."""
+        level_state = self.log_level_var.get()
+        if level_state is None:
+            return self.base_log_bits
+        return level_state[1]
+
+    @property
+    def is_at_beg(self) -> bool:
+        return self.is_at_beg_var.get()
+
+    @is_at_beg.setter
+    def is_at_beg(self, is_at_beg: bool):
+        self.is_at_beg_var.set(is_at_beg)
+
+    def is_root_context(self) -> bool:
+        """Main thread, and not in a running asyncio loop."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        asyncio = sys.modules.get("asyncio")
+        if asyncio is None:
+            return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        return False
+
+    def init_log_queue(self):
+        if self.use_async:
+            self.log_queue = TCLogQueue(
+                emit=self.emit_records,
+                max_size=self.async_queue_size,
+                batch_size=self.async_batch_size,
+                overflow=self.async_overflow,
+                name=f"{self.name}.writer",
+            )
+        else:
+            self.log_queue = None
+
+    def set_filter(
+        self,
+        rate_limit: float = None,
+        sample_rate: float = None,
+        every_n: int = None,
+        summary_interval: float = 10.0,
+        methods: list[str] = None,
+    ):
+        """Rate limit or sample records per (method, call site), see TCLogFilter.
+        Call with no args to disable filter."""
+        if getattr(self, "log_filter", None) is not None:
+            self.cancel_filter_timer()
+            self.log_filter_summaries()
+        if rate_limit is None and sample_rate is None and not every_n:
+            self.log_filter = None
+        else:
+            self.log_filter = TCLogFilter(
+                rate_limit=rate_limit,
+                sample_rate=sample_rate,
+                every_n=every_n,
+                summary_interval=summary_interval,
+                methods=methods,
+            )
+
+    def is_filter_passed(self, method: str, frame) -> bool:
+        is_passed = self.log_filter.check(method, frame)
+        if not is_passed and self.filter_timer is None:
+            self.start_filter_timer()
+        return is_passed
+
+    def start_filter_timer(self):
+        """Write summaries after summary_interval of first suppressed record,
+        so they are not delayed until next filtered call."""
+        with self.filter_timer_lock:
+            if self.filter_timer is not None:
+                return
+            self.filter_timer = threading.Timer(
+                self.log_filter.summary_interval, self.on_filter_timer
+            )
+            self.filter_timer.daemon = True
+            self.filter_timer.start()
+
+    def on_filter_timer(self):
+        with self.filter_timer_lock:
+            self.filter_timer = None
+        if self.log_filter is not None:
+            self.log_filter_summaries()
+
+    def cancel_filter_timer(self):
+        with self.filter_timer_lock:
+            if self.filter_timer is not None:
+                self.filter_timer.cancel()
+                self.filter_timer = None
+
+    def log_filter_summaries(self):
+        """Log counts of records suppressed by filter since last summary."""
+        for method, msg in self.log_filter.pop_summaries():
+            if not self.should_suppress(method):
+                self.log(method, msg)
+
+    def init_ring_sink(self):
+        """Ring sink captures records below log_level, without rendering them,
+        and dumps them on err/fail, or by dump_ring()."""
+        if self.ring_size:
+            self.ring_sink = RingSink(self.ring_size)
+        else:
+            self.ring_sink = None
+
+    def init_sinks(self):
+        self.console_sink = ConsoleSink()
+        self.addHandler(TCLogHandler(self))
+        self.sinks: list[LogSink] = [
+            sink
+            for sink in [
+                self.console_sink,
+                self.file_sink,
+                self.jsonl_sink,
+                self.ring_sink,
+            ]
+            if sink is not None
+        ]
+        self.update_sinks()
+
+    def add_sink(self, sink: LogSink) -> LogSink:
+        """Register sink. A new RingSink replaces the current one."""
+        if isinstance(sink, RingSink):
+            if self.ring_sink is not None:
+                self.sinks.remove(self.ring_sink)
+            self.ring_sink = sink
+        elif isinstance(sink, JsonlSink):
+            self.jsonl_sink = self.jsonl_sink or sink
+        elif isinstance(sink, FileSink):
+            self.file_sink = self.file_sink or sink
+            self.use_file = True
+        elif isinstance(sink, ConsoleSink):
+            self.console_sink = self.console_sink or sink
+        self.sinks.append(sink)
+        self.update_sinks()
+        return sink
+
+    def remove_sink(self, sink: LogSink):
+        if sink not in self.sinks:
+            return
+        self.sinks.remove(sink)
+        for attr in ["console_sink", "file_sink", "jsonl_sink", "ring_sink"]:
+            if getattr(self, attr) is sink:
+                # fallback to another registered sink of same type
+                others = [s for s in self.sinks if type(s) is type(sink)]
+                setattr(self, attr, others[0] if others else None)
+        self.update_sinks()
+
+    def update_sinks(self):
+        """Precompute which formats are needed by registered sinks."""
+        self.emit_sinks = [s for s in self.sinks if not isinstance(s, RingSink)]
+        self.use_jsonl_record = any(s.format == "json" for s in self.emit_sinks)
+        # text sinks without channel need text even if not verbose and not use_file
+        self.use_text_always = any(
+            s.format != "json" and s.channel is None for s in self.emit_sinks
+        )
+        if self.ring_sink is not None:
+            self.capture_bits = self.get_log_bits(self.ring_sink.level or "debug")
+        else:
+            self.capture_bits = 0
+        self.update_log_bits()
+
+    def capture_record(self, method: str, msg, kwargs: dict):
+        self.ring_sink.write(
+            (
+                time.time(),
+                method,
+                msg,
+                self.log_indent + kwargs.get("indent", 0),
+                kwargs.get("msg_args"),
+            )
+        )
+
+    def dump_ring(self, count: int = None) -> int:
+        """Write latest `count` (default all) captured records to file sink,
+        or to stream if no file sink. Return count of dumped records."""
+        if self.ring_sink is None:
+            return 0
+        ring_records = self.ring_sink.pop_records(count)
+        if not ring_records:
+            return 0
+        lines = []
+        for ts, method, msg, indent, msg_args in ring_records:
+            time_str = self.get_prefix_time_str(ts, use_ms=True)
+            msg_str = decolored(self.render_msg(msg, msg_args))
+            indent_str = " " * indent
+            lines.append(
+                f"[{time_str}] [{method.upper()}] [{self.name}] {indent_str}{msg_str}"
+            )
+        method = ring_records[-1][1]
+        use_file = self.file_sink is not None
+        record = TCLogRecord(
+            method=method,
+            level=LOG_METHOD_COLORS[method][0],
+            msg_lines=lines,
+            is_colored=False,
+            verbose=not use_file,
+            use_file=use_file,
+        )
+        self.add_records([record])
+        return len(ring_records)
+
+    def init_dedup_states(self):
+        self.dedup_lock = threading.Lock()
+        self.dedup_key = None
+        self.dedup_count = 0
+        self.dedup_method = None
+        self.dedup_indent = 0
+        self.dedup_timer: threading.Timer = None
+
+    def dedup_msg(
+        self, method: str, msg_str: str, indent: int, end: str
+    ) -> tuple[bool, list[TCLogRecord]]:
+        """Return (is_repeated, records of repeat summary of previous msg).
+        Only whole lines are compared, as partial lines may be continued."""
+        if self.is_at_beg and "\n" in end:
+            key = hash((method, msg_str))
+        else:
+            key = None
+        with self.dedup_lock:
+            if key is not None and key == self.dedup_key:
+                self.dedup_count += 1
+                if self.dedup_count == 1 and self.dedup_timeout is not None:
+                    self.dedup_timer = threading.Timer(
+                        self.dedup_timeout, self.on_dedup_timeout, args=(key,)
+                    )
+                    self.dedup_timer.daemon = True
+                    self.dedup_timer.start()
+                return True, []
+            records = self.pop_dedup_records()
+            self.dedup_key = key
+            self.dedup_method = method
+            self.dedup_indent = indent
+        return False, records
+
+    def pop_dedup_records(self) -> list[TCLogRecord]:
+        """Render "last message repeated N times", and reset count."""
+        if self.dedup_count <= 0:
+            return []
+        dedup_count = self.dedup_count
+        self.dedup_count = 0
+        if self.dedup_timer is not None:
+            self.dedup_timer.cancel()
+            self.dedup_timer = None
+        if self.should_suppress(self.dedup_method):
+            return []
+        return self.render_records(
+            self.dedup_method,
+            f"last message repeated {dedup_count} times",
+            indent=self.dedup_indent - self.log_indent,
+            use_dedup=False,
+        )
+
+    def on_dedup_timeout(self, key: int):
+        with self.dedup_lock:
+            if key != self.dedup_key:
+                return
+            records = self.pop_dedup_records()
+        if records:
+            self.put_records(records)
+
+    def flush_dedup(self):
+        """Write repeat summary of pending repeated msg."""
+        with self.dedup_lock:
+            records = self.pop_dedup_records()
+        if records:
+            self.add_records(records)
+
+    @property
+    def dropped_count(self) -> int:
+        """Count of records dropped by async queue overflow."""
+        if self.log_queue is None:
+            return 0
+        return self.log_queue.dropped_count
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until all records logged before this call are written."""
+        if self.log_filter is not None:
+            self.log_filter_summaries()
+        if self.dedup_count:
+            # also repeats deduped by per-call use_dedup
+            self.flush_dedup()
+        if self.log_queue is not None:
+            res = self.log_queue.flush(timeout=timeout)
+        else:
+            res = True
+        for sink in self.sinks:
+            sink.flush()
+        return res
+
+    @property
+    def aio(self) -> "AsyncTCLogger":
+        """Non-blocking facade for coroutines, see AsyncTCLogger."""
+        if self.async_logger is None:
+            from .asyncs import AsyncTCLogger
+
+            self.async_logger = AsyncTCLogger(self)
+        return self.async_logger
+
+    async def aflush(self):
+        """Wait until records logged before this call (by logger.aio) are written."""
+        await self.aio.aflush()
+
+    def close(self, timeout: float = None):
+        """Drain and stop async writer. Later records are written synchronously."""
+        if self.log_filter is not None:
+            self.cancel_filter_timer()
+            self.log_filter_summaries()
+        if self.dedup_count:
+            # also repeats deduped by per-call use_dedup
+            self.flush_dedup()
+        if self.log_queue is not None:
+            self.log_queue.close(timeout=timeout)
+        for sink in self.sinks:
+            sink.close()
 
     def init_file_path(self):
         if self.use_file:
@@ -172,11 +721,37 @@ class TCLogger(logging.Logger):
                 self.file_path = Path(self.file_path)
             else:
                 self.file_path = Path("logger.log")
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            if self.file_mode == "w":
-                open(self.file_path, "w").close()
+            self.file_sink = FileSink(
+                self.file_path,
+                file_mode=self.file_mode,
+                buffer_size=self.file_buffer_size,
+                flush_interval=self.file_flush_interval,
+                max_bytes=self.file_max_bytes,
+                rotate_interval=self.file_rotate_interval,
+                backup_count=self.file_backup_count,
+                compress=self.file_compress,
+                process_safe=self.file_process_safe,
+            )
         else:
             self.file_path = None
+            self.file_sink = None
+
+        if self.use_jsonl:
+            self.jsonl_path = Path(self.jsonl_path or "logger.jsonl")
+            self.jsonl_sink = JsonlSink(
+                self.jsonl_path,
+                file_mode=self.file_mode,
+                buffer_size=self.file_buffer_size,
+                flush_interval=self.file_flush_interval,
+                max_bytes=self.file_max_bytes,
+                rotate_interval=self.file_rotate_interval,
+                backup_count=self.file_backup_count,
+                compress=self.file_compress,
+                process_safe=self.file_process_safe,
+            )
+        else:
+            self.jsonl_path = None
+            self.jsonl_sink = None
 
     def indent(self, indent=2):
         self.log_indent += indent
@@ -188,25 +763,53 @@ class TCLogger(logging.Logger):
         self.log_indent = 0
 
     def store_indent(self):
-        self.log_indents.append(self.log_indent)
+        self.log_indents_var.set(self.log_indents_var.get() + (self.log_indent,))
 
     def restore_indent(self):
-        self.log_indent = self.log_indents.pop(-1)
+        log_indents = self.log_indents_var.get()
+        self.log_indent = log_indents[-1]
+        self.log_indents_var.set(log_indents[:-1])
 
     def set_level(
         self, level: Literal["critical", "error", "warning", "info", "debug"]
     ):
-        self.log_level = level
-        self.setLevel(self.LEVEL_NAMES[level])
-        for handler in self.handlers:
-            handler.setLevel(self.LEVEL_NAMES[level])
+        """Set level of current context.
+        In main thread (outside asyncio loop), it is also the base level,
+        which is the default of other threads."""
+        if self.is_root_context():
+            # root context follows base level
+            self.log_level_var.set(None)
+            self.base_log_level = level
+            self.base_log_bits = self.get_log_bits(level)
+            self.setLevel(self.LEVEL_NAMES[level])
+            self.update_log_bits()
+        else:
+            self.log_level = level
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Stdlib logging API (e.g., logger.info()) also follows level of current
+        context, and is not cached, as this logger is not in logging manager."""
+        if self.disabled or self.manager.disable >= level:
+            return False
+        return level >= self.LEVEL_NAMES[self.log_level]
+
+    def get_log_bits(self, level: str) -> int:
+        """Precompute bitmap of methods enabled by level,
+        so disabled calls only cost one attribute check and bit test."""
+        level_no = self.LEVEL_NAMES[level]
+        log_bits = 0
+        for method, (method_level, color) in LOG_METHOD_COLORS.items():
+            if self.LEVEL_NAMES[method_level] >= level_no:
+                log_bits |= LOG_METHOD_BITS[method]
+        return log_bits
 
     def store_level(self):
-        self.log_levels.append(self.log_level)
+        self.log_levels_var.set(self.log_levels_var.get() + (self.log_level,))
 
     def restore_level(self):
-        self.log_level = self.log_levels.pop(-1)
-        self.set_level(self.log_level)
+        log_levels = self.log_levels_var.get()
+        self.log_levels_var.set(log_levels[:-1])
+        self.set_level(log_levels[-1])
 
     def quiet(self):
         self.set_level("error")
@@ -220,15 +823,29 @@ class TCLogger(logging.Logger):
         if quiet:
             self.restore_level()
 
-    def get_prefix_str(self, method: str) -> str:
-        """Generate prefix string with timestamp, log level, and logger name."""
-        now = get_now()
-        if self.use_prefix_ms:
-            time_str = (
-                now.strftime("%Y-%m-%d %H:%M:%S") + f".{now.microsecond // 1000:03d}"
-            )
-        else:
-            time_str = now.strftime("%Y-%m-%d %H:%M:%S")
+    def get_prefix_time_str(self, now_ts: float = None, use_ms: bool = None) -> str:
+        """Second-resolution part is only formatted once per second."""
+        if now_ts is None:
+            now_ts = time.time()
+        if use_ms is None:
+            use_ms = self.use_prefix_ms
+        now_sec = int(now_ts)
+        sec_cache = self.prefix_sec_cache
+        if sec_cache[0] != now_sec or sec_cache[1] != times.TIMEZONE:
+            now = datetime.fromtimestamp(now_sec, ZoneInfo(times.TIMEZONE))
+            sec_cache = (now_sec, times.TIMEZONE, now.strftime("%Y-%m-%d %H:%M:%S"))
+            self.prefix_sec_cache = sec_cache
+        if use_ms:
+            ms = min(int((now_ts - now_sec) * 1000), 999)
+            return f"{sec_cache[2]}.{ms:03d}"
+        return sec_cache[2]
+
+    def get_prefix_fragments(self, method: str, is_whole_colored: bool):
+        """Cached (head, tail) around time_str in prefix, with colors applied."""
+        key = (method, self.name, self.use_prefix_color, is_whole_colored)
+        fragments = self.prefix_fragments.get(key)
+        if fragments is not None:
+            return fragments
 
         method_upper = method.upper()
         if self.use_prefix_color:
@@ -236,19 +853,61 @@ class TCLogger(logging.Logger):
         else:
             method_str = method_upper
 
-        prefix_str = f"[{time_str}] [{method_str}] [{self.name}] "
+        if is_whole_colored:
+            # same as coloring whole "[{time_str}] [{method_str}] [{name}] ",
+            # where already colored method_str is kept as nested
+            color_prefix, color_suffix = logstr.SPECS.get(method, ("", ""))
+            head = f"{color_prefix}["
+            tail = f"] [{color_suffix}{method_str}" + logstr.colored_str(
+                f"] [{self.name}] ", method
+            )
+        else:
+            head = "["
+            tail = f"] [{method_str}] [{self.name}] "
+        fragments = (head, tail)
+        self.prefix_fragments[key] = fragments
+        return fragments
+
+    def get_prefix(self, method: str) -> tuple[str, str, str]:
+        """(colored_head, time_str, colored_tail) of prefix."""
+        is_whole_colored = self.use_prefix and self.use_prefix_color
+        head, tail = self.get_prefix_fragments(method, is_whole_colored)
+        return (head, self.get_prefix_time_str(), tail)
 
-        if self.use_prefix and self.use_prefix_color:
-            prefix_str = logstr.colored_str(prefix_str, method)
+    def get_prefix_str(self, method: str) -> str:
+        """Generate prefix string with timestamp, log level, and logger name."""
+        return "".join(self.get_prefix(method))
 
-        return prefix_str
+    def get_plain_prefix_str(self, method: str, time_str: str) -> str:
+        key = (method, self.name, None, None)
+        fragments = self.prefix_fragments.get(key)
+        if fragments is None:
+            fragments = ("[", f"] [{method.upper()}] [{self.name}] ")
+            self.prefix_fragments[key] = fragments
+        return fragments[0] + time_str + fragments[1]
 
     def should_suppress(self, method) -> bool:
         """if level is lower (less important) than self.log_level, do not log"""
-        level, color = LOG_METHOD_COLORS[method]
-        if self.LEVEL_NAMES[level] < self.LEVEL_NAMES[self.log_level]:
-            return True
-        return False
+        return not self.level_bits & LOG_METHOD_BITS[method]
+
+    def render_msg(self, msg, msg_args: tuple = None) -> str:
+        """Lazy msg is rendered here, only when the record would be emitted:
+        - msg is zero-arg function: use its return
+        - msg_args is given: use `msg % msg_args`
+        """
+        if isinstance(msg, LAZY_MSG_TYPES):
+            msg = msg()
+        if msg_args is not None:
+            msg = msg % msg_args
+
+        if type(msg) == str:
+            msg_str = msg
+        else:
+            msg_str = repr(msg)
+            quotes = ["'", '"']
+            if msg_str[0] in quotes and msg_str[-1] in quotes:
+                msg_str = msg_str[1:-1]
+        return msg_str
 
     def update_is_at_beg(self, end):
         if end is None or "\n" in end or "\r" in end:
@@ -256,12 +915,12 @@ class TCLogger(logging.Logger):
         else:
             self.is_at_beg = False
 
-    def log_to_file(self, msg, end):
-        msg = decolored(msg)
-        with open(self.file_path, mode="a", encoding="utf-8") as f:
-            f.write(msg + end)
+    def log(self, method, msg, *args, **kwargs):
+        records = self.render_records(method, msg, *args, **kwargs)
+        if records:
+            self.add_records(records)
 
-    def log(
+    def render_records(
         self,
         method,
         msg,
@@ -272,105 +931,299 @@ class TCLogger(logging.Logger):
         use_prefix: bool = None,
         verbose: bool = None,
         use_file: bool = None,
+        msg_args: tuple = None,
+        use_dedup: bool = None,
         *args,
         **kwargs,
-    ):
+    ) -> list[TCLogRecord]:
+        """Return rendered records, which are empty if msg is a suppressed repeat,
+        or led by the repeat summary of previous msg."""
         verbose = self.verbose if verbose is None else verbose
         use_file = self.use_file if use_file is None else use_file
-        if not verbose and not use_file:
-            return
+        use_jsonl = self.use_jsonl_record
+        use_text = verbose or use_file or self.use_text_always
+        if not use_text and not use_jsonl:
+            return []
 
-        if type(msg) == str:
-            msg_str = msg
-        else:
-            msg_str = repr(msg)
-            quotes = ["'", '"']
-            if msg_str[0] in quotes and msg_str[-1] in quotes:
-                msg_str = msg_str[1:-1]
+        msg_str = self.render_msg(msg, msg_args)
 
-        if use_prefix is True or (use_prefix is None and self.use_prefix):
-            prefix_str = self.get_prefix_str(method)
+        if self.use_dedup if use_dedup is None else use_dedup:
+            is_repeated, records = self.dedup_msg(
+                method, msg_str, self.log_indent + indent, end
+            )
+            if is_repeated:
+                return records
         else:
-            prefix_str = ""
+            records = []
 
         # level is method name of standard logging.Logger:
         # "debug", "info", "warning", "error", "critical"
         level, color = LOG_METHOD_COLORS[method]
 
-        indent_str = " " * (self.log_indent + indent)
-
-        if self.is_at_beg:
-            beg_str = prefix_str + indent_str
-        else:
-            beg_str = ""
-
-        whole_msg = "\n".join(
-            [beg_str + logstr.colored_str(line, method) for line in msg_str.split("\n")]
-        )
-
         if end is None:
             end = "\n"
 
-        self.update_is_at_beg(end)
+        if use_jsonl:
+            jsonl_record = self.get_jsonl_record(
+                method, level, msg_str, indent, end, kwargs.get("extra")
+            )
+        else:
+            jsonl_record = None
+
+        is_at_beg = self.is_at_beg
+        if use_text:
+            if is_at_beg and (
+                use_prefix is True or (use_prefix is None and self.use_prefix)
+            ):
+                prefix = self.get_prefix(method)
+            else:
+                prefix = None
+            record = TCLogRecord(
+                method=method,
+                level=level,
+                msg_lines=msg_str.split("\n"),
+                prefix=prefix,
+                indent_str=" " * (self.log_indent + indent),
+                is_at_beg=is_at_beg,
+                fill_side=fill_side if fill else None,
+                end=end,
+                verbose=verbose,
+                use_file=use_file,
+                args=args,
+                kwargs=kwargs,
+                jsonl_record=jsonl_record,
+            )
+        else:
+            record = TCLogRecord(
+                method=method,
+                level=level,
+                end=end,
+                verbose=verbose,
+                use_file=use_file,
+                args=args,
+                kwargs=kwargs,
+                jsonl_record=jsonl_record,
+            )
 
-        if fill:
-            whole_msg = add_fills(whole_msg, fill_side=fill_side)
+        self.update_is_at_beg(end)
 
-        handler = self.handlers[0]
-        handler.terminator = end
+        if kwargs:
+            # capture exception and stack now, as writer thread may have none
+            if kwargs.get("exc_info") is True:
+                kwargs["exc_info"] = sys.exc_info()
+            if kwargs.get("stack_info") is True:
+                kwargs["stack_info"] = "".join(traceback.format_stack()[:-1])
+        records.append(record)
+        return records
+
+    def add_records(self, records: list[TCLogRecord]):
+        batch = self.batch_var.get()
+        if batch is not None and batch.is_open:
+            batch.records.extend(records)
+            return
+        self.put_records(records)
 
-        if verbose:
-            getattr(self, level)(whole_msg, *args, **kwargs)
+    def put_records(self, records: list[TCLogRecord]):
+        if self.log_queue is not None:
+            for record in records:
+                self.log_queue.put(record)
+        else:
+            self.emit_records(records)
 
-        if use_file:
-            self.log_to_file(whole_msg, end=end)
+    def get_jsonl_record(
+        self,
+        method: str,
+        level: str,
+        msg_str: str,
+        indent: int = 0,
+        end: str = "\n",
+        extra: dict = None,
+    ) -> dict:
+        """msg is raw text captured before colorization,
+        so decolored() regex only runs if caller embedded colors in msg."""
+        now_ts = time.time()
+        jsonl_record = {
+            "ts": int(now_ts * 1000) / 1000,
+            "time": self.get_prefix_time_str(now_ts, use_ms=True),
+            "method": method,
+            "level": level,
+            "name": self.name,
+            "indent": self.log_indent + indent,
+            "msg": decolored(msg_str),
+        }
+        if end != "\n":
+            jsonl_record["end"] = end
+        if extra:
+            for key, val in extra.items():
+                jsonl_record.setdefault(key, val)
+        return jsonl_record
+
+    def render_record_msg(self, record: TCLogRecord, is_colored: bool) -> str:
+        """Render msg_lines of record, with prefix, indent, colors and fills."""
+        method = record.method
+        if record.is_at_beg:
+            beg_str = record.indent_str
+            prefix = record.prefix
+            if prefix is not None:
+                if is_colored:
+                    beg_str = "".join(prefix) + beg_str
+                else:
+                    beg_str = self.get_plain_prefix_str(method, prefix[1]) + beg_str
+        else:
+            beg_str = ""
+        if record.fill_side is not None and not is_colored:
+            # fills width is counted on colored text, so keep same as colored
+            return decolored(self.render_record_msg(record, is_colored=True))
+        if is_colored and record.is_colored:
+            whole_msg = "\n".join(
+                [
+                    beg_str + logstr.colored_str(line, method)
+                    for line in record.msg_lines
+                ]
+            )
+        elif is_colored:
+            whole_msg = "\n".join([beg_str + line for line in record.msg_lines])
+        else:
+            # prefix and indent are plain, so only colors embedded by caller are
+            # stripped, and decolored() returns at once if msg has none
+            whole_msg = decolored(
+                "\n".join([beg_str + line for line in record.msg_lines])
+            )
+        if record.fill_side is not None:
+            whole_msg = add_fills(whole_msg, fill_side=record.fill_side)
+        return whole_msg
+
+    def get_record_text(self, record: TCLogRecord, is_colored: bool = True) -> str:
+        """Text of record, with logging-style args, exc_info and stack_info, and end."""
+        msg = self.render_record_msg(record, is_colored)
+        if record.args:
+            msg = msg % record.args
+        kwargs = record.kwargs
+        if kwargs:
+            exc_info = kwargs.get("exc_info")
+            if exc_info:
+                if isinstance(exc_info, BaseException):
+                    exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+                elif not isinstance(exc_info, tuple):
+                    exc_info = sys.exc_info()
+                if exc_info[0] is not None:
+                    exc_str = "".join(traceback.format_exception(*exc_info))
+                    msg = f"{msg}\n{exc_str.rstrip()}"
+            stack_info = kwargs.get("stack_info")
+            if isinstance(stack_info, str):
+                msg = f"{msg}\nStack (most recent call last):\n{stack_info.rstrip()}"
+        return msg + record.end
+
+    def render_format(self, records: list[TCLogRecord], format: str) -> list:
+        """Items of records in format, None if record has no text."""
+        if format == "json":
+            return [record.jsonl_record for record in records]
+        is_colored = format == "colored"
+        return [
+            (
+                self.get_record_text(record, is_colored)
+                if record.msg_lines is not None
+                else None
+            )
+            for record in records
+        ]
+
+    def emit_records(self, records: list[TCLogRecord]):
+        """Write records to registered sinks.
+        Each format is rendered once and shared among sinks,
+        and each sink gets records passing its level and channel in one write."""
+        level_names = self.LEVEL_NAMES
+        rendered = {}
+        for sink in self.emit_sinks:
+            items = rendered.get(sink.format)
+            if items is None:
+                items = self.render_format(records, sink.format)
+                rendered[sink.format] = items
+            channel, sink_level_no = sink.channel, sink.level_no
+            sink_items = []
+            for record, item in zip(records, items):
+                if item is None or level_names[record.level] < sink_level_no:
+                    continue
+                if channel == "stream" and not record.verbose:
+                    continue
+                if channel == "file" and not record.use_file:
+                    continue
+                sink_items.append(item)
+            if sink_items:
+                try:
+                    sink.write_items(sink_items)
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
 
     def route_log(self, method, msg, *args, **kwargs):
         if self.should_suppress(method):
+            if self.ring_sink is not None:
+                self.capture_record(method, msg, kwargs)
+            return
+        # frame of caller of logger.<method>(), checked before msg is rendered
+        if self.log_filter is not None and not self.is_filter_passed(
+            method, sys._getframe(2)
+        ):
             return
+        if self.ring_sink is not None and method in RING_DUMP_METHODS:
+            self.dump_ring()
         self.log(method, msg, *args, **kwargs)
 
     def err(self, msg: str = "", *args, **kwargs):
-        self.route_log("err", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["err"]:
+            self.route_log("err", msg, *args, **kwargs)
 
     def erro(self, msg: str = "", *args, **kwargs):
-        self.route_log("erro", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["erro"]:
+            self.route_log("erro", msg, *args, **kwargs)
 
     def warn(self, msg: str = "", *args, **kwargs):
-        self.route_log("warn", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["warn"]:
+            self.route_log("warn", msg, *args, **kwargs)
 
     def glow(self, msg: str = "", *args, **kwargs):
-        self.route_log("glow", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["glow"]:
+            self.route_log("glow", msg, *args, **kwargs)
 
     def hint(self, msg: str = "", *args, **kwargs):
-        self.route_log("hint", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["hint"]:
+            self.route_log("hint", msg, *args, **kwargs)
 
     def note(self, msg: str = "", *args, **kwargs):
-        self.route_log("note", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["note"]:
+            self.route_log("note", msg, *args, **kwargs)
 
     def mesg(self, msg: str = "", *args, **kwargs):
-        self.route_log("mesg", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["mesg"]:
+            self.route_log("mesg", msg, *args, **kwargs)
 
     def file(self, msg: str = "", *args, **kwargs):
-        self.route_log("file", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["file"]:
+            self.route_log("file", msg, *args, **kwargs)
 
     def line(self, msg: str = "", *args, **kwargs):
-        self.route_log("line", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["line"]:
+            self.route_log("line", msg, *args, **kwargs)
 
     def success(self, msg: str = "", *args, **kwargs):
-        self.route_log("success", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["success"]:
+            self.route_log("success", msg, *args, **kwargs)
 
     def okay(self, msg: str = "", *args, **kwargs):
-        self.route_log("okay", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["okay"]:
+            self.route_log("okay", msg, *args, **kwargs)
 
     def fail(self, msg: str = "", *args, **kwargs):
-        self.route_log("fail", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["fail"]:
+            self.route_log("fail", msg, *args, **kwargs)
 
     def back(self, msg: str = "", *args, **kwargs):
-        self.route_log("back", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["back"]:
+            self.route_log("back", msg, *args, **kwargs)
 
     def dbug(self, msg: str = "", *args, **kwargs):
-        self.route_log("dbug", msg, *args, **kwargs)
+        if self.log_bits & LOG_METHOD_BITS["dbug"]:
+            self.route_log("dbug", msg, *args, **kwargs)
 
     class TempIndent:
         def __init__(self, logger: "TCLogger", indent=2):
@@ -388,6 +1241,45 @@ class TCLogger(logging.Logger):
     def temp_indent(self, indent=2):
         return self.TempIndent(self, indent=indent)
 
+    class LogBatch:
+        def __init__(self, logger: "TCLogger"):
+            self.logger: "TCLogger" = logger
+            self.records: list[TCLogRecord] = []
+            self.is_open = False
+
+        def __enter__(self):
+            outer_batch = self.logger.batch_var.get()
+            if outer_batch is None or not outer_batch.is_open:
+                self.is_open = True
+                self.logger.batch_var.set(self)
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            if not self.is_open:
+                return
+            # tasks copied context inside this block would see it closed
+            self.is_open = False
+            self.logger.batch_var.set(None)
+            records, self.records = self.records, []
+            if records:
+                self.logger.put_records(records)
+
+    def batch(self):
+        """Records logged in this block (by current context) are rendered as usual,
+        then written to stream and file sinks in one write at block exit."""
+        return self.LogBatch(self)
+
+    def log_many(self, items: Iterable[tuple], **kwargs):
+        """Log items of (method, msg) or (method, msg, kwargs) in one batch."""
+        with self.batch():
+            for item in items:
+                method, msg = item[0], item[1]
+                if len(item) > 2 and item[2]:
+                    item_kwargs = {**kwargs, **item[2]}
+                else:
+                    item_kwargs = kwargs
+                getattr(self, method)(msg, **item_kwargs)
+
 
 logger = TCLogger()
 
@@ -0,0 +1,167 @@
+"""Bounded record queue drained by a background writer thread"""
+
+import sys
+import threading
+import traceback
+import weakref
+
+from collections import deque
+from typing import Callable, Literal
+
+from .forks import register_exit_hook, unregister_exit_hook, register_fork_reset
+
+OVERFLOW_TYPE = Literal["block", "drop_oldest", "drop_newest"]
+
+
+class TCLogQueue:
+    """Bounded queue of log records, drained in batches by a daemon writer thread.
+
+    Overflow policies when queue is full:
+    - block: wait until the writer frees space
+    - drop_oldest: evict the oldest pending record
+    - drop_newest: discard the incoming record
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[list], None],
+        max_size: int = 10000,
+        batch_size: int = 256,
+        overflow: OVERFLOW_TYPE = "block",
+        name: str = "TCLogQueue",
+    ):
+        if overflow not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Invalid overflow: {overflow}")
+        self.emit = emit
+        self.max_size = max(int(max_size), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.overflow = overflow
+        self.name = name
+        # list of (seq, record)
+        self.records: deque = deque()
+        self.cond = threading.Condition()
+        self.put_seq = 0
+        self.done_seq = 0
+        self.dropped_oldest_count = 0
+        self.dropped_newest_count = 0
+        self.is_closed = False
+        self.start_thread()
+        register_exit_hook(self, self.close)
+        register_fork_reset(self)
+
+    def start_thread(self):
+        # thread only holds queue weakly, so unused queue is collected and closed
+        self.thread = threading.Thread(
+            target=self.run, args=(weakref.ref(self),), name=self.name, daemon=True
+        )
+        self.thread.start()
+
+    def reset_after_fork(self):
+        # writer thread does not survive fork, and pending records belong to parent
+        self.cond = threading.Condition()
+        self.records.clear()
+        self.put_seq = 0
+        self.done_seq = 0
+        if not self.is_closed:
+            self.start_thread()
+
+    @property
+    def dropped_count(self) -> int:
+        return self.dropped_oldest_count + self.dropped_newest_count
+
+    def put(self, record) -> bool:
+        """Return False if record is dropped."""
+        with self.cond:
+            if self.is_closed:
+                # writer is gone, so emit on caller thread to not lose records
+                self.emit([record])
+                return True
+            if len(self.records) >= self.max_size:
+                if self.overflow == "drop_newest":
+                    self.dropped_newest_count += 1
+                    return False
+                elif self.overflow == "drop_oldest":
+                    self.records.popleft()
+                    self.dropped_oldest_count += 1
+                else:
+                    while len(self.records) >= self.max_size and not self.is_closed:
+                        self.cond.wait()
+                    if self.is_closed:
+                        self.emit([record])
+                        return True
+            self.put_seq += 1
+            self.records.append((self.put_seq, record))
+            self.cond.notify_all()
+            return True
+
+    def pop_batch(self) -> list:
+        with self.cond:
+            batch = []
+            while self.records and len(batch) < self.batch_size:
+                batch.append(self.records.popleft())
+            self.cond.notify_all()
+            return batch
+
+    def emit_batch(self, batch: list):
+        try:
+            self.emit([record for seq, record in batch])
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+        with self.cond:
+            self.done_seq = batch[-1][0]
+            self.cond.notify_all()
+
+    @staticmethod
+    def run(queue_ref: weakref.ref, poll_interval: float = 1.0):
+        while True:
+            queue = queue_ref()
+            if queue is None:
+                break
+            cond = queue.cond
+            with cond:
+                if not queue.records and not queue.is_closed:
+                    # not hold queue while waiting, so it can be collected
+                    del queue
+                    cond.wait(timeout=poll_interval)
+                    continue
+                batch = queue.pop_batch()
+            if not batch:
+                # closed and drained
+                break
+            queue.emit_batch(batch)
+            del queue
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until all records put before this call are emitted (or dropped).
+        Return False if timeout is reached first."""
+        with self.cond:
+            target_seq = self.put_seq
+            return self.cond.wait_for(
+                lambda: self.done_seq >= target_seq or not self.thread.is_alive(),
+                timeout=timeout,
+            )
+
+    def close(self, timeout: float = None):
+        """Drain pending records and stop the writer thread."""
+        with self.cond:
+            if self.is_closed:
+                return
+            self.is_closed = True
+            self.cond.notify_all()
+        is_writer = self.thread is threading.current_thread()
+        if not is_writer:
+            self.thread.join(timeout=timeout)
+        if is_writer or not self.thread.is_alive():
+            # drain left records on caller thread, as writer thread also exits
+            # when queue is being collected, where its weakref is already cleared
+            batch = self.pop_batch()
+            while batch:
+                self.emit_batch(batch)
+                batch = self.pop_batch()
+        unregister_exit_hook(self, self.close)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
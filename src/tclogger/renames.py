@@ -52,7 +52,7 @@ def log_rename(
     indent: int = 2,
 ):
     """Log the renaming of a file or folder."""
-    with logger.temp_indent(indent):
+    with logger.temp_indent(indent), logger.batch():
         logger.note(f"> Renaming {text_type}:")
         logger.warn(f"  * from: {old}")
         logger.okay(f"  * to  : {new}")
@@ -60,13 +60,14 @@ def log_rename(
 
 def log_paths_to_rename(paths_to_rename: dict[str, list[PathType]]):
     """Log the paths that will be renamed."""
-    logger.note(f"> Following paths will be renamed:")
-    for text_type, paths in paths_to_rename.items():
-        if not paths:
-            continue
-        logger.mesg(f"  * {text_type}:")
-        for p in paths:
-            logger.hint(f"    * {p}")
+    with logger.batch():
+        logger.note(f"> Following paths will be renamed:")
+        for text_type, paths in paths_to_rename.items():
+            if not paths:
+                continue
+            logger.mesg(f"  * {text_type}:")
+            for p in paths:
+                logger.hint(f"    * {p}")
 
 
 def log_match(p: PathType, text_type: Literal["content", "file", "folder"]):
@@ -0,0 +1,532 @@
+"""Output sinks for logger records"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import socket
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from .types import PathType
+from .forks import register_exit_hook, register_fork_reset
+
+try:
+    # python >= 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+COMPRESS_TYPE = Literal["gzip", "zstd"]
+COMPRESS_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+FORMAT_TYPE = Literal["colored", "plain", "json"]
+LEVEL_TYPE = Literal["critical", "error", "warning", "info", "debug"]
+
+
+class FileCompressor:
+    """Compress rotated files on a background thread, then apply retention."""
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="FileCompressor", daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, path: Path, compress: COMPRESS_TYPE, on_done=None):
+        self.start()
+        register_exit_hook(self, self.join)
+        self.jobs.put((path, compress, on_done))
+
+    def run(self):
+        while True:
+            path, compress, on_done = self.jobs.get()
+            try:
+                compress_file(path, compress)
+                if on_done:
+                    on_done()
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self.jobs.task_done()
+
+    def join(self):
+        """Wait for pending compressions, so no rotated file is left half-done."""
+        self.jobs.join()
+
+
+file_compressor = FileCompressor()
+
+
+def get_compress_type(compress: COMPRESS_TYPE = None) -> COMPRESS_TYPE:
+    """zstd falls back to gzip if stdlib has no zstd support."""
+    if compress == "zstd" and zstd is None:
+        return "gzip"
+    return compress
+
+
+def compress_file(path: Path, compress: COMPRESS_TYPE = "gzip") -> Path:
+    compress = get_compress_type(compress)
+    dst_path = path.with_name(path.name + COMPRESS_SUFFIXES[compress])
+    tmp_path = dst_path.with_name(dst_path.name + ".tmp")
+    if compress == "zstd":
+        opener = zstd.open
+    else:
+        opener = gzip.open
+    with open(path, "rb") as rf, opener(tmp_path, "wb") as wf:
+        shutil.copyfileobj(rf, wf, length=1024 * 1024)
+    tmp_path.replace(dst_path)
+    path.unlink()
+    return dst_path
+
+
+class LogSink:
+    """Base of sinks registered to TCLogger.
+
+    - level: min level of records to write, None means all records passed by logger
+    - format: "colored" text, "plain" text, or "json" dict;
+        logger renders each format once per record, and shares it among sinks
+    - channel: "stream" sinks only write records with `verbose`,
+        "file" sinks only write records with `use_file`, None means all records
+    """
+
+    channel: Literal["stream", "file"] = None
+
+    def __init__(self, level: LEVEL_TYPE = None, format: FORMAT_TYPE = "plain"):
+        self.level = level
+        self.level_no = logging.getLevelName(level.upper()) if level else 0
+        self.format = format
+
+    def write_items(self, items: list):
+        """items are texts (with ends) for text formats, or dicts for "json"."""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class ConsoleSink(LogSink):
+    """Write texts to stream, which is sys.stderr (resolved at write) by default."""
+
+    channel = "stream"
+
+    def __init__(
+        self,
+        stream=None,
+        level: LEVEL_TYPE = None,
+        format: FORMAT_TYPE = "colored",
+    ):
+        super().__init__(level=level, format=format)
+        self.stream = stream
+        self.lock = threading.Lock()
+        register_fork_reset(self)
+
+    def reset_after_fork(self):
+        self.lock = threading.Lock()
+
+    def write_items(self, items: list[str]):
+        stream = self.stream or sys.stderr
+        with self.lock:
+            stream.write("".join(items))
+            stream.flush()
+
+
+class FileSink(LogSink):
+    """Long-lived file handle with write buffer and rotation.
+
+    - buffer_size: bytes (approx, counted by chars) to hold before writing,
+        0 means write and flush every record
+    - flush_interval: seconds, max time that buffered records stay in memory
+    - max_bytes: rotate when file size exceeds this
+    - rotate_interval: seconds, rotate when file is opened for longer than this
+    - backup_count: number of rotated files to keep, None means keep all
+    - compress: compress rotated files on background thread,
+        "zstd" falls back to "gzip" if not available in stdlib
+    - process_safe: for multiple processes writing to same file,
+        file is opened with O_APPEND and unbuffered, and each write() syscall only
+        carries whole lines, partial line (end without "\n") is held until complete.
+        On local filesystems such appends do not interleave (NFS is not safe).
+        Rotation is best-effort in this mode.
+
+    Rotated files are named as `<stem>.<YYYYmmdd_HHMMSS>_<seq><suffix>[.gz|.zst]`,
+    where seq increases with each rotation and is never reused, so it orders backups.
+    With compress, only compressed backups count for backup_count.
+    """
+
+    channel = "file"
+
+    def __init__(
+        self,
+        file_path: PathType,
+        file_mode: Literal["a", "w"] = "a",
+        buffer_size: int = 0,
+        flush_interval: float = 1.0,
+        max_bytes: int = None,
+        rotate_interval: float = None,
+        backup_count: int = None,
+        compress: COMPRESS_TYPE = None,
+        process_safe: bool = False,
+        encoding: str = "utf-8",
+        level: LEVEL_TYPE = None,
+        format: FORMAT_TYPE = "plain",
+    ):
+        super().__init__(level=level, format=format)
+        self.file_path = Path(file_path)
+        self.file_mode = file_mode
+        self.buffer_size = max(int(buffer_size or 0), 0)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = get_compress_type(compress)
+        self.process_safe = process_safe
+        self.encoding = encoding
+        self.file = None
+        self.file_size = 0
+        self.open_t = time.time()
+        self.rotate_seq = 0
+        self.buffer: list[str] = []
+        self.buffer_len = 0
+        self.pending_line = ""
+        self.flush_t = time.monotonic()
+        self.lock = threading.RLock()
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.file_mode == "w":
+            open(self.file_path, "w").close()
+        self.flush_thread = None
+        self.is_closed = False
+        self.start_flush_thread()
+        register_exit_hook(self, self.close)
+        register_fork_reset(self)
+
+    def start_flush_thread(self):
+        self.stop_event = threading.Event()
+        if self.buffer_size > 0 and self.flush_interval:
+            # thread only holds sink weakly, so unused sink is collected and closed
+            self.flush_thread = threading.Thread(
+                target=self.run_flush,
+                args=(weakref.ref(self), self.stop_event, self.flush_interval),
+                name="FileSink.flush",
+                daemon=True,
+            )
+            self.flush_thread.start()
+
+    def stop_flush_thread(self):
+        self.stop_event.set()
+        flush_thread, self.flush_thread = self.flush_thread, None
+        if flush_thread is not None and flush_thread is not threading.current_thread():
+            flush_thread.join()
+
+    def reset_after_fork(self):
+        # records buffered before fork belong to parent, which will write them
+        self.lock = threading.RLock()
+        self.buffer = []
+        self.buffer_len = 0
+        self.pending_line = ""
+        if not self.is_closed:
+            self.start_flush_thread()
+
+    def open_file(self):
+        if self.file is None:
+            if self.process_safe:
+                # unbuffered, so each f.write() is one write() syscall
+                self.file = open(self.file_path, mode="ab", buffering=0)
+            else:
+                self.file = open(self.file_path, mode="ab")
+            self.file_size = os.fstat(self.file.fileno()).st_size
+            self.open_t = time.time()
+        return self.file
+
+    def is_rotated_by_others(self) -> bool:
+        try:
+            return not os.path.samestat(
+                os.fstat(self.file.fileno()), os.stat(self.file_path)
+            )
+        except FileNotFoundError:
+            return True
+
+    def should_rotate(self) -> bool:
+        if self.process_safe and self.max_bytes:
+            # other processes also append to this file
+            self.file_size = os.fstat(self.file.fileno()).st_size
+        if self.max_bytes and self.file_size >= self.max_bytes:
+            return True
+        if self.rotate_interval and time.time() - self.open_t >= self.rotate_interval:
+            return True
+        return False
+
+    def get_backup_seq_paths(self) -> list[tuple[int, Path]]:
+        """(seq, path) of rotated files, from oldest to newest."""
+        stem, suffix = self.file_path.stem, self.file_path.suffix
+        pattern = re.compile(
+            rf"{re.escape(stem)}\.\d{{8}}_\d{{6}}_(\d+){re.escape(suffix)}(\.gz|\.zst)?"
+        )
+        seq_paths = []
+        for path in self.file_path.parent.iterdir():
+            match = pattern.fullmatch(path.name)
+            if match:
+                seq_paths.append((int(match.group(1)), path))
+        return sorted(seq_paths)
+
+    def get_rotated_path(self) -> Path:
+        # seq of other processes (or previous runs) is also considered
+        seqs = [seq for seq, path in self.get_backup_seq_paths()]
+        self.rotate_seq = max([self.rotate_seq, *seqs]) + 1
+        stem, suffix = self.file_path.stem, self.file_path.suffix
+        t_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.file_path.with_name(f"{stem}.{t_str}_{self.rotate_seq}{suffix}")
+
+    def get_backup_paths(self) -> list[Path]:
+        """Rotated files that are done (compressed, if compress), from oldest to newest.
+        Files queued for compression are not counted."""
+        paths = [path for seq, path in self.get_backup_seq_paths()]
+        if self.compress:
+            compress_suffix = COMPRESS_SUFFIXES[self.compress]
+            paths = [path for path in paths if path.name.endswith(compress_suffix)]
+        return paths
+
+    def remove_old_backups(self):
+        if self.backup_count is None:
+            return
+        backup_paths = self.get_backup_paths()
+        remove_count = max(len(backup_paths) - max(self.backup_count, 0), 0)
+        for path in backup_paths[:remove_count]:
+            path.unlink(missing_ok=True)
+
+    def rotate(self):
+        """Close current file, rename it, and compress it in background."""
+        with self.lock:
+            if self.file is not None:
+                is_rotated_by_others = self.process_safe and self.is_rotated_by_others()
+                self.file.close()
+                self.file = None
+                if is_rotated_by_others:
+                    # just reopen new file at file_path
+                    return
+            self.open_t = time.time()
+            if not self.file_path.exists() or self.file_path.stat().st_size <= 0:
+                return
+            rotated_path = self.get_rotated_path()
+            self.file_path.rename(rotated_path)
+            self.file_size = 0
+            if self.compress:
+                file_compressor.submit(
+                    rotated_path, self.compress, on_done=self.remove_old_backups
+                )
+            else:
+                self.remove_old_backups()
+
+    def write_file(self, text: str):
+        if self.file is not None and self.should_rotate():
+            self.rotate()
+        data = text.encode(self.encoding)
+        f = self.open_file()
+        if self.process_safe:
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view) :]
+        else:
+            f.write(data)
+            f.flush()
+        self.file_size += len(data)
+
+    def split_pending_line(self, text: str) -> str:
+        """Return whole lines to write, and hold the trailing partial line."""
+        text = self.pending_line + text
+        idx = text.rfind("\n") + 1
+        self.pending_line = text[idx:]
+        return text[:idx]
+
+    def write(self, text: str):
+        with self.lock:
+            if self.process_safe:
+                text = self.split_pending_line(text)
+                if not text:
+                    return
+            if self.buffer_size <= 0 or self.is_closed:
+                # no flush thread after close, so write through
+                self.write_file(text)
+                return
+            self.buffer.append(text)
+            self.buffer_len += len(text)
+            if self.buffer_len >= self.buffer_size:
+                self.flush()
+            elif (
+                self.flush_interval is not None
+                and time.monotonic() - self.flush_t >= self.flush_interval
+            ):
+                self.flush()
+
+    def write_items(self, items: list[str]):
+        self.write("".join(items))
+
+    def flush(self):
+        with self.lock:
+            if self.buffer:
+                text = "".join(self.buffer)
+                self.buffer.clear()
+                self.buffer_len = 0
+                self.write_file(text)
+            self.flush_t = time.monotonic()
+
+    @staticmethod
+    def run_flush(sink_ref: weakref.ref, stop_event: threading.Event, interval: float):
+        while not stop_event.wait(interval):
+            sink = sink_ref()
+            if sink is None:
+                break
+            if sink.buffer and time.monotonic() - sink.flush_t >= interval:
+                sink.flush()
+            del sink
+
+    def close(self):
+        """Flush buffer, stop flush thread and close file handle.
+        Later writes would reopen the file, and are not buffered."""
+        self.stop_flush_thread()
+        with self.lock:
+            self.is_closed = True
+            self.flush()
+            if self.pending_line:
+                self.write_file(self.pending_line)
+                self.pending_line = ""
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class JsonlSink(FileSink):
+    """Write one compact JSON object per line, with FileSink buffer and rotation."""
+
+    channel = None
+
+    def __init__(self, file_path: PathType, *args, **kwargs):
+        super().__init__(file_path, *args, **kwargs)
+        self.format = "json"
+        # reuse one encoder, instead of json.dumps() building it per call
+        self.encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+
+    def write_records(self, records: list[dict]):
+        encode = self.encoder.encode
+        self.write("".join([encode(record) + "\n" for record in records]))
+
+    def write_items(self, items: list[dict]):
+        self.write_records(items)
+
+
+class SocketSink(LogSink):
+    """Send records to TCP server, as JSON lines (or texts for text formats).
+
+    Stand-in for shipping logs over network: connection is opened lazily,
+    and on send error, the batch is dropped (counted) and reconnected at next write,
+    so a down server never blocks or breaks logging.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9020,
+        level: LEVEL_TYPE = None,
+        format: FORMAT_TYPE = "json",
+        timeout: float = 1.0,
+    ):
+        super().__init__(level=level, format=format)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock: socket.socket = None
+        self.dropped_count = 0
+        self.encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        self.lock = threading.Lock()
+        register_fork_reset(self)
+
+    def reset_after_fork(self):
+        # socket is shared with parent, so open a new one
+        self.lock = threading.Lock()
+        self.sock = None
+
+    def write_items(self, items: list):
+        if self.format == "json":
+            encode = self.encoder.encode
+            text = "".join([encode(item) + "\n" for item in items])
+        else:
+            text = "".join(items)
+        data = text.encode("utf-8")
+        with self.lock:
+            try:
+                if self.sock is None:
+                    self.sock = socket.create_connection(
+                        (self.host, self.port), timeout=self.timeout
+                    )
+                self.sock.sendall(data)
+            except OSError:
+                self.dropped_count += len(items)
+                self.close_socket()
+
+    def close_socket(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def close(self):
+        with self.lock:
+            self.close_socket()
+
+
+class RingSink(LogSink):
+    """Bounded in-memory buffer of unrendered records, oldest are dropped first.
+    It captures records (>= its level) which are below logger level,
+    and these are rendered only when dumped.
+    deque append and popleft are thread-safe, so no lock is needed."""
+
+    def __init__(self, max_size: int = 1000, level: LEVEL_TYPE = "debug"):
+        super().__init__(level=level, format="plain")
+        self.max_size = max(int(max_size), 1)
+        self.records: deque = deque(maxlen=self.max_size)
+
+    def write(self, record: tuple):
+        self.records.append(record)
+
+    def pop_records(self, count: int = None) -> list[tuple]:
+        """Pop all records, and return the latest `count` of them."""
+        records = []
+        while self.records:
+            try:
+                records.append(self.records.popleft())
+            except IndexError:
+                break
+        if count is not None:
+            records = records[-count:] if count > 0 else []
+        return records
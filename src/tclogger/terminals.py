@@ -0,0 +1,105 @@
+"""Process-wide cache of terminal size, so redraws need no geometry syscalls"""
+
+import os
+import signal
+import sys
+import threading
+import time
+
+
+class TerminalSize:
+    """Cached columns and lines of terminal attached to stdout.
+
+    Cache is refreshed by a SIGWINCH handler, which is installed on first read
+    from main thread, and calls previous handler after refreshing.
+    If handler is not installed (no SIGWINCH, or only read from other threads),
+    or is replaced later (e.g., by another library), or stdout is not a tty,
+    cache is re-read at most every `poll_interval` seconds.
+    """
+
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self.columns: int = None
+        self.lines: int = None
+        self.check_t: float = None
+        self.is_tty = False
+        self.is_handler_installed = False
+        self.prev_handler = None
+
+    def read(self):
+        """Same order as shutil.get_terminal_size(): COLUMNS and LINES env vars,
+        then size of terminal attached to stdout."""
+        try:
+            size = os.get_terminal_size(sys.__stdout__.fileno())
+            self.columns, self.lines = size.columns, size.lines
+            is_tty = True
+        except (AttributeError, ValueError, OSError):
+            self.columns, self.lines = None, None
+            is_tty = False
+        for name in ["COLUMNS", "LINES"]:
+            try:
+                value = int(os.environ.get(name, 0))
+            except ValueError:
+                value = 0
+            if value > 0:
+                setattr(self, name.lower(), value)
+        self.is_tty = is_tty
+
+    def install_handler(self):
+        if not hasattr(signal, "SIGWINCH"):
+            return
+        if threading.current_thread() is not threading.main_thread():
+            return
+        try:
+            self.prev_handler = signal.signal(signal.SIGWINCH, self.on_resize)
+        except (ValueError, OSError):
+            return
+        self.is_handler_installed = True
+
+    def is_handler_active(self) -> bool:
+        # bound methods are equal (not identical) if of same object and function
+        return signal.getsignal(signal.SIGWINCH) == self.on_resize
+
+    def on_resize(self, signum, frame):
+        self.read()
+        if callable(self.prev_handler):
+            self.prev_handler(signum, frame)
+
+    def check(self):
+        """Re-read cache at most every `poll_interval` seconds,
+        unless it is kept fresh by active handler."""
+        now_t = time.monotonic()
+        if self.check_t is not None and now_t - self.check_t < self.poll_interval:
+            return
+        self.check_t = now_t
+        if not self.is_handler_installed:
+            self.install_handler()
+        elif self.is_tty and self.is_handler_active():
+            return
+        self.read()
+
+    def get_columns(self, fallback: int = 80) -> int:
+        self.check()
+        return self.columns or fallback
+
+    def get_lines(self, fallback: int = 24) -> int:
+        self.check()
+        return self.lines or fallback
+
+
+def is_stream_tty(stream) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+TERMINAL_SIZE = TerminalSize()
+
+
+def get_terminal_columns(fallback: int = 80) -> int:
+    return TERMINAL_SIZE.get_columns(fallback)
+
+
+def get_terminal_lines(fallback: int = 24) -> int:
+    return TERMINAL_SIZE.get_lines(fallback)